@@ -2,43 +2,36 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import joblib
-import re
-from nltk import pos_tag, word_tokenize
-from nltk.corpus import wordnet
-from nltk.stem import WordNetLemmatizer
-import nltk
 import plotly.express as px
-import pycountry
 from datetime import datetime
 import plotly.graph_objs as go
 import plotly.express as px
 from wordcloud import WordCloud
 import matplotlib.pyplot as plt
-from sklearn.metrics import accuracy_score
 import seaborn as sns
-from sklearn.metrics import confusion_matrix, precision_score, recall_score, f1_score, classification_report
 
-nltk.download('averaged_perceptron_tagger')
-nltk.download('punkt')
-nltk.download('wordnet')
-nltk.download('omw-1.4')
-nltk.download('vader_lexicon')
+from sentiment.countries import UNKNOWN_COUNTRY, resolve_country_names
+from sentiment.ingest import load_normalized, read_only
+from sentiment.metrics import SentimentMetrics
+from sentiment.predict import predict_data as predict_with
+from sentiment.text import clean_series, preprocess
+from sentiment.time_index import TimeIndex
 
 # Assuming you already have functions like load_model(), preprocess(), predict_data() defined
 
-# Load your data
-@st.cache_data
+# Load your data once per process; the frame is shared read-only, not copied per rerun
+@st.cache_resource
 def load_data():
-    return pd.read_csv(r"C:\Users\UGBOKE GEORGE\OneDrive\Documents\archive (3)\Teepublic_review.csv", encoding= "latin1")
+    return read_only(load_normalized(r"C:\Users\UGBOKE GEORGE\OneDrive\Documents\archive (3)\Teepublic_review.csv"))
+
+# Rows are sorted by period at ingest; the index turns the sliders into row slices
+@st.cache_resource
+def load_time_index():
+    return TimeIndex.build(load_data())
 
 df = load_data()
 
 
-def get_country_name(alpha_2_code):
-    try:
-        return pycountry.countries.get(alpha_2=alpha_2_code).name
-    except AttributeError:
-        return "Unknown"
             
     
 def create_wordcloud(text):
@@ -70,31 +63,6 @@ def show_wordcloud_for_negative_reviews(df):
     
     
 # Helper functions
-def preprocess(text_data):
-    if pd.isnull(text_data):
-        return ""
-    cleaning_pattern = r'[^\w\s\']|_|\d|[^\x00-\x7F]+'
-    cleaned_text = re.sub(cleaning_pattern, '', text_data)
-    return cleaned_text
-
-def get_wordnet_pos(treebank_tag):
-    if treebank_tag.startswith('J'):
-        return wordnet.ADJ
-    elif treebank_tag.startswith('V'):
-        return wordnet.VERB
-    elif treebank_tag.startswith('N'):
-        return wordnet.NOUN
-    elif treebank_tag.startswith('R'):
-        return wordnet.ADV
-    else:
-        return wordnet.NOUN  
-
-def lemmatize_text(text):
-    lemmatizer = WordNetLemmatizer()
-    word_pos_tags = pos_tag(word_tokenize(text))
-    lemmatized_words = [lemmatizer.lemmatize(word, get_wordnet_pos(tag)) for word, tag in word_pos_tags]
-    return ' '.join(lemmatized_words)
-
 def load(vectorizer_path, model_path):
     vectorizer = joblib.load(vectorizer_path)
     model = joblib.load(model_path)
@@ -111,8 +79,6 @@ def main():
     
     df = load_data()
     
-    df['title'] = df['title'].apply(preprocess)
-    df['review'] = df['review'].apply(preprocess)
     # Navigation or page layout options
     page = st.sidebar.selectbox("Choose your page", ["Prediction", "Dashboard"])
 
@@ -128,7 +94,7 @@ def main():
         if st.button('Predict'):
             if uploaded_file is not None:
                 data = pd.read_csv(uploaded_file)
-                data['review'] = data['review'].apply(preprocess)  # Apply preprocessing to the review column
+                data['review'] = clean_series(data['review'])  # Apply preprocessing to the review column
                 predictions = predict_data(data, vectorizer_path, model_path)
                 data['predictions'] = predictions
                 # Map numeric predictions to textual labels
@@ -139,9 +105,10 @@ def main():
                 
                 
                     
-                    # Calculate the value counts for both actual and predicted sentiments
-                actual_sentiments = data['sentiment'].value_counts().sort_index()
-                predicted_sentiments = data['predictions'].value_counts().sort_index()
+                    # One pass over the labels; every metric below comes from these counts
+                metrics = SentimentMetrics().update(data['sentiment'], data['predictions'])
+                actual_sentiments = metrics.actual_counts()
+                predicted_sentiments = metrics.predicted_counts()
                     # Create a dataframe for plotting
                 comparison_df = pd.DataFrame({
                     'Actual Sentiments': actual_sentiments,
@@ -152,16 +119,16 @@ def main():
                             title='Comparison of Actual and Predicted Sentiments')
                 st.plotly_chart(fig, use_container_width=True)
                  
-                accuracy = accuracy_score(data['sentiment'], data['predictions'])
+                accuracy = metrics.accuracy
     # Display accuracy in a card
                 st.metric(label="Prediction Accuracy", value=f"{accuracy:.2%}")
                 
                 
                 
-                cm = confusion_matrix(data['sentiment'], data['predictions'])
-                precision = precision_score(data['sentiment'], data['predictions'], zero_division=0)
-                recall = recall_score(data['sentiment'], data['predictions'], zero_division=0)
-                f1 = f1_score(data['sentiment'], data['predictions'], zero_division=0)
+                cm = metrics.counts
+                precision = metrics.precision()
+                recall = metrics.recall()
+                f1 = metrics.f1()
 
                 
                 st.subheader('Confusion Matrix')
@@ -178,11 +145,10 @@ def main():
 
                 # Display classification report
                 st.subheader('Classification Report')
-                report = classification_report(data['sentiment'], data['predictions'], output_dict=True)
+                report = metrics.classification_report()
                 st.json(report)
 
                 # Display accuracy in a card
-                accuracy = accuracy_score(data['sentiment'], data['predictions'])
                 st.metric(label="Prediction Accuracy", value=f"{accuracy:.2%}")
                 
                 
@@ -194,15 +160,13 @@ def main():
                 st.write("Prediction:", sentiment)
 
     elif page == "Dashboard":              
-        df['country_name'] = df['store_location'].apply(get_country_name)     
+        # country_name is already a column: load_normalized applies the dtype schema
     
 # Date range selection for year only
         st.subheader('Select Year Range')
         start_year, end_year = st.slider(
             'Select year range', min_value=2018, max_value=2024, value=(2018, 2024)
         )
-# Filter the data based on the selected year range
-        filtered_year_data = df[(df['date'] >= start_year) & (df['date'] <= end_year)]                
         st.subheader('Select Month Range')
 # You can use a range slider for the month selection
         start_month, end_month = st.select_slider(
@@ -210,12 +174,8 @@ def main():
             options=list(range(1, 13)),
             value=(1, 12)
         )
-        filtered_month_data = filtered_year_data[
-            (filtered_year_data['month'] >= start_month) & 
-            (filtered_year_data['month'] <= end_month)
-        ]        
-        #Calculations for the cards based on filtered_df
-        filtered_df = filtered_month_data
+        # Binary search over the period offsets; a zero-copy slice of df for whole years
+        filtered_df = load_time_index().view(df, start_year, end_year, start_month, end_month)
         # st.write(filtered_df.head())
 
 
@@ -261,11 +221,10 @@ def main():
             tick0=min(sentiment_over_years.index),  # Start tick marks at the minimum year
             tickvals=sentiment_over_years.index  # Set the tick values to the years in the index
         )
-        filtered_df['month'] = filtered_df['month'].astype(str).str.zfill(2)  # Adds leading zeros
-        # Combine year and month into a single column for more detailed grouping
-        filtered_df['year_month'] = filtered_df['date'].astype(str) + '-' + filtered_df['month']
-        # Group by 'year_month' and 'Actual_sentiment'
-        sentiment_over_months = filtered_df.groupby(['year_month', 'Actual_sentiment']).size().unstack().fillna(0)
+        # Group on the integer period key from ingest; labels are only built per month
+        sentiment_over_months = filtered_df.groupby(['period', 'Actual_sentiment']).size().unstack().fillna(0)
+        sentiment_over_months.index = [f"{period // 12}-{period % 12 + 1:02d}" for period in sentiment_over_months.index]
+        sentiment_over_months.index.name = 'year_month'
         # Create a line chart with the sentiment over months
         fig_months = px.line(sentiment_over_months, x=sentiment_over_months.index, y=[1, 0], labels={'value': 'Number of Reviews', 'year_month': 'Month'}, title='Sentiment Over Months')
 
@@ -438,7 +397,7 @@ def main():
 
 # Assuming 'store_location' is the column with country codes
 # Calculate the total sentiments and sum of positive sentiments for each country
-        country_sentiments = filtered_df.groupby('store_location')['Actual_sentiment'].agg(
+        country_sentiments = filtered_df.groupby('store_location', observed=True)['Actual_sentiment'].agg(
             total_sentiments='count', 
             positive_sentiments='sum'
         )
@@ -446,8 +405,8 @@ def main():
         country_sentiments['negative_percent'] = 100 - country_sentiments['positive_percent']
         country_sentiments['negative_sentiments'] = country_sentiments['total_sentiments'] - country_sentiments['positive_sentiments']
 
-# Add a column with country names using the get_country_name function
-        country_sentiments['country_name'] = country_sentiments.index.map(get_country_name)
+# Add a column with country names using the country code table
+        country_sentiments['country_name'] = resolve_country_names(country_sentiments.index).fillna(UNKNOWN_COUNTRY)
         sorted_countries = country_sentiments.sort_values(by='total_sentiments', ascending=False).reset_index()
 
 
@@ -602,15 +561,9 @@ def main():
 
 
 
-def predict_data(input_data, vectorizer_path, model_path):
+def predict_data(input_data, vectorizer_path, model_path, workers=1):
     vectorizer, model = load(vectorizer_path, model_path)
-    if isinstance(input_data, pd.DataFrame):
-        text_data = input_data['review'].apply(lambda x: lemmatize_text(preprocess(x)))
-    else:
-        text_data = pd.Series([lemmatize_text(preprocess(input_data))])
-    text_features = vectorizer.transform(text_data)
-    predictions = model.predict(text_features)
-    return predictions
+    return predict_with(input_data, vectorizer, model, workers=workers)
     #predictions = ['Positive Sentiment' if pred == 1 else 'Negative Sentiment' for pred in predictions]
     #return predictions
 
@@ -1,190 +1,442 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import joblib
-import re
-from nltk import pos_tag, word_tokenize
-import nltk
-from nltk.corpus import wordnet
-from nltk.stem import WordNetLemmatizer
-import plotly.express as px
-from wordcloud import WordCloud
-import pycountry
-from datetime import datetime
-import plotly.graph_objs as go
-from wordcloud import WordCloud
-import matplotlib.pyplot as plt
-from sklearn.metrics import accuracy_score, confusion_matrix, precision_score, recall_score, f1_score, classification_report
-import seaborn as sns
-
-import gdown
-
-nltk.download('averaged_perceptron_tagger')
-nltk.download('punkt')
-nltk.download('wordnet')
-nltk.download('omw-1.4')
-nltk.download('vader_lexicon')
+import gzip
+import os
+import tempfile
+import weakref
+
+# plotly, matplotlib, seaborn and wordcloud are imported
+# inside the functions that draw with them, so a session that only opens the
+# Prediction page never pays for them. benchmarks/import_profile.py guards this.
+
+from sentiment.artifacts import STARTUP_TIMINGS, ArtifactUnavailable, fetch_artifact, sha256sum, startup_stage
+from sentiment.countries import UNKNOWN_COUNTRY, resolve_country_names, unknown_code_counts
+from sentiment.cube import TREND_RESOLUTIONS, build_sentiment_cube, sentiment_by, sentiment_trend, trend_resolution
+from sentiment.ingest import load_normalized, read_only
+from sentiment.kernel import linear_kernel
+from sentiment.lemma_cache import lemma_cache
+from sentiment import profiling
+from sentiment.metrics import SentimentMetrics
+from sentiment.prediction_cache import model_key, prediction_cache
+from sentiment.predict import load_artifacts, predict_data
+from sentiment.streaming import DEFAULT_CHUNKSIZE, stream_predictions
+from sentiment.text import clean_series, preprocess
+from sentiment.time_index import TimeIndex
+from sentiment.word_index import WordIndex
 
 @st.cache_resource
 def load_data():
-    url = 'https://drive.google.com/uc?id=16EV2Pz8pkr973dowSI7bnEGy-8Xzc2Gx'
-    output = 'Teepublic_review.csv'
-    gdown.download(url, output, quiet=False)
-    return pd.read_csv(output, encoding="latin1")
+    # Shared by every session: read-only, and only ever filtered into views.
+    with startup_stage('load_data'):
+        return read_only(load_normalized(fetch_artifact('dataset')))
+
+# Row counts for profiling.timed: whole-dataset stages report every review,
+# period stages the reviews inside the period (counted from the time index).
+def dataset_rows(*args, **kwargs):
+    return len(load_data())
+
+def period_rows(version, period, *args, **kwargs):
+    return sum(stop - start for start, stop in load_time_indexes()[0].slices(*period))
+
+def search_rows(df, version, period, *args, **kwargs):
+    return period_rows(version, period)
 
 @st.cache_resource
-def load_model(vectorizer_url, model_url):
-    vectorizer_output = 'vectorizer.joblib'
-    model_output = 'svm_model.joblib'
-    gdown.download(vectorizer_url, vectorizer_output, quiet=False)
-    gdown.download(model_url, model_output, quiet=False)
-    vectorizer = joblib.load(vectorizer_output)
-    model = joblib.load(model_output)
-    return vectorizer, model
+def load_model():
+    with startup_stage('load_model'):
+        # Memory-mapped, so several server processes on a host share one copy.
+        return load_artifacts(fetch_artifact('vectorizer'), fetch_artifact('model'), mmap=True)
 
 @st.cache_resource
-def load_image(url):
-    output = 'logo.png'
-    gdown.download(url, output, quiet=False)
-    return plt.imread(output)
+def load_kernel():
+    # None for models the linear fast path cannot score; predict_data then
+    # falls back to vectorizer.transform + model.predict.
+    return linear_kernel(*load_model())
 
-def get_country_name(alpha_2_code):
-    try:
-        return pycountry.countries.get(alpha_2=alpha_2_code).name
-    except AttributeError:
-        return "Unknown"
+@st.cache_resource
+def load_online_model(version):
+    from sentiment.online import ModelStore
+    return load_artifacts(*ModelStore().paths(version), mmap=True)
+
+@st.cache_resource
+@profiling.timed(rows=dataset_rows)
+def load_sentiment_cube():
+    cube = build_sentiment_cube(load_data())
+    names = resolve_country_names(cube['store_location'])
+    unknown_codes = unknown_code_counts(cube['store_location'], names, cube['total'])
+    cube['country_name'] = names.fillna(UNKNOWN_COUNTRY)
+    return cube, unknown_codes
+
+@st.cache_resource
+def load_time_indexes():
+    # (dataset index, cube index): both are sorted by period at build time, so
+    # a period filter is a binary search plus one slice per selected year.
+    return TimeIndex.build(load_data()), TimeIndex.build(load_sentiment_cube()[0])
+
+@st.cache_resource
+def load_dataset_version():
+    # Part of every st.cache_data key below, so a changed dataset never
+    # serves figures built from the old one.
+    return sha256sum(fetch_artifact('dataset'))[:16]
+
+@st.cache_resource
+@profiling.timed(rows=dataset_rows)
+def load_word_index():
+    return WordIndex.build(load_data())
 
-def create_wordcloud(text):
-    wordcloud = WordCloud(width=800, height=400, background_color='white').generate(text)
+@st.cache_resource
+def load_lemma_cache():
+    with startup_stage('load_lemma_cache'):
+        lemma_cache.load()
+    return lemma_cache
+
+@st.cache_resource
+def load_prediction_cache():
+    with startup_stage('load_prediction_cache'):
+        prediction_cache.load()
+    return prediction_cache
+
+@st.cache_resource
+def load_model_key(online_version=None):
+    if online_version is None:
+        return model_key(fetch_artifact('vectorizer'), fetch_artifact('model'))
+    from sentiment.online import ModelStore
+    return model_key(*ModelStore().paths(online_version))
+
+@st.cache_resource
+def load_image():
+    with startup_stage('load_image'):
+        return fetch_artifact('logo')
+
+@profiling.timed()
+def create_wordcloud(frequencies):
+    from wordcloud import WordCloud
+    wordcloud = WordCloud(width=800, height=400, background_color='white').generate_from_frequencies(frequencies)
     return wordcloud
 
+@profiling.timed()
 def plot_wordcloud(wordcloud):
+    import matplotlib.pyplot as plt
     plt.figure(figsize=(10, 5))
     plt.imshow(wordcloud, interpolation='bilinear')
     plt.axis('off')
     plt.tight_layout(pad=0)
     st.pyplot(plt)
 
-def preprocess(text_data):
-    if pd.isnull(text_data):
-        return ""
-    cleaning_pattern = r'[^\w\s\']|_|\d|[^\x00-\x7F]+'
-    cleaned_text = re.sub(cleaning_pattern, '', text_data)
-    return cleaned_text
-
-def get_wordnet_pos(treebank_tag):
-    if treebank_tag.startswith('J'):
-        return wordnet.ADJ
-    elif treebank_tag.startswith('V'):
-        return wordnet.VERB
-    elif treebank_tag.startswith('N'):
-        return wordnet.NOUN
-    elif treebank_tag.startswith('R'):
-        return wordnet.ADV
-    else:
-        return wordnet.NOUN  
-
-def lemmatize_text(text):
-    lemmatizer = WordNetLemmatizer()
-    word_pos_tags = pos_tag(word_tokenize(text))
-    lemmatized_words = [lemmatizer.lemmatize(word, get_wordnet_pos(tag)) for word, tag in word_pos_tags]
-    return ' '.join(lemmatized_words)
-
-def show_wordcloud_for_negative_reviews(df):
-    negative_reviews = df[df['Actual_sentiment'] == 0]['title']
-    combined_reviews = ' '.join(negative_reviews)
-    wordcloud = create_wordcloud(combined_reviews)
-    plot_wordcloud(wordcloud)
+@profiling.timed(rows=period_rows)
+def show_wordcloud_for_negative_reviews(version, period):
+    image = negative_wordcloud(version, period)[1]
+    if image is None:
+        st.error("No titles available to generate a word cloud.")
+        return
+    plot_wordcloud(image)
 
 def main():
-    logo_url = 'https://drive.google.com/uc?id=17-RLfDavjYKh3xvLQKqZTYBMXyHIC-rw'
+    load_lemma_cache()
     col1, col2 = st.columns([3,1])
     with col2: 
-        st.image(load_image(logo_url), width=100)
+        st.image(load_image(), width=100)
     with col1:
         st.title('Geospatial Sentiment Dashboard')
 
-    df = load_data()
-    df['title'] = df['title'].apply(preprocess)
-    df['review'] = df['review'].apply(preprocess)
     page = st.sidebar.selectbox("Choose your page", ["Prediction", "Dashboard"])
 
-    if page == "Prediction":
-        handle_prediction_page(df)
-    elif page == "Dashboard":
-        handle_dashboard_page(df)
+    try:
+        if page == "Prediction":
+            handle_prediction_page()
+        elif page == "Dashboard":
+            # Only the dashboard needs the review dataset.
+            df = load_data()
+            before, after = df.attrs['memory_footprint']
+            st.sidebar.caption(f"Dataset memory: {before / 2**20:.1f} MB raw, {after / 2**20:.1f} MB with compact dtypes")
+            handle_dashboard_page(df)
+    except (ArtifactUnavailable, LookupError) as exc:
+        # NLTK reports missing corpora as a plain LookupError; KeyError and
+        # IndexError are LookupErrors too but are bugs, not missing downloads.
+        if isinstance(exc, (KeyError, IndexError)):
+            raise
+        message = str(exc)
+        if not isinstance(exc, ArtifactUnavailable):
+            message += "\n\nRun python -m sentiment fetch --trust-on-first-use once to download every artifact and the NLTK data."
+        st.error(f"Setup incomplete, reload this page once it is fixed. {message}")
+    if STARTUP_TIMINGS:
+        st.sidebar.caption("Cold start: " + ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in STARTUP_TIMINGS.items()))
+    if profiling.is_enabled():
+        display_profiling_panel()
 
-def handle_prediction_page(df):
+def display_profiling_panel():
+    # Only shown with SENTIMENT_PROFILE=1; totals accumulate across reruns until reset.
+    with st.sidebar.expander("Stage timings"):
+        snapshot = profiling.timings.snapshot()
+        if snapshot:
+            table = pd.DataFrame.from_dict(snapshot, orient='index').sort_values('seconds', ascending=False)
+            st.dataframe(table[['calls', 'seconds', 'last_seconds', 'max_seconds', 'rows']])
+        else:
+            st.caption("No stages recorded yet.")
+        st.download_button("Download JSON", profiling.timings.to_json(), file_name='stage_timings.json', mime='application/json')
+        st.download_button("Download Prometheus", profiling.timings.to_prometheus(), file_name='stage_timings.prom', mime='text/plain')
+        if st.button("Reset timings"):
+            profiling.timings.reset()
+
+@profiling.timed()
+def handle_prediction_page():
     st.subheader('Upload a CSV file or enter text for prediction')
     text_input = st.text_area("Enter Text")
     uploaded_file = st.file_uploader("Choose a CSV file")
-    vectorizer_url = 'https://drive.google.com/uc?id=1erkiQ_FBYJoQ3YXhe9FW70C0SnYVLPrg'
-    model_url = 'https://drive.google.com/uc?id=11Xt9Mvjz2tIC5cM_fipmksTEFNFPAxRX'
+    use_all_cores = st.checkbox("Use all CPU cores for CSV prediction")
+    stream_upload = st.checkbox("Stream large CSV files in chunks")
+    chunksize = st.number_input("Rows per chunk", min_value=1000, value=DEFAULT_CHUNKSIZE, step=1000) if stream_upload else DEFAULT_CHUNKSIZE
+    from sentiment.online import ModelStore, labelled_batch
+    store = ModelStore()
+    online_version = store.current()
+    use_online = online_version is not None and st.radio("Model", ["Bundled SVM", f"Online model v{online_version}"]) != "Bundled SVM"
+    learn = online_version is not None and not stream_upload and st.checkbox("Fold labelled CSV rows into the online model")
 
     if st.button('Predict'):
-        vectorizer, model = load_model(vectorizer_url, model_url)
-        if uploaded_file is not None:
+        if use_online:
+            vectorizer, model = load_online_model(online_version)
+            kernel = None
+        else:
+            vectorizer, model = load_model()
+            kernel = load_kernel()
+        cache = load_prediction_cache()
+        key = load_model_key(online_version if use_online else None)
+        workers = None if use_all_cores else 1
+
+        def predict(data, workers=1):
+            return predict_data(data, vectorizer, model, workers=workers, kernel=kernel, cache=cache, model_key=key)
+
+        if uploaded_file is not None and stream_upload:
+            handle_streaming_prediction(uploaded_file, lambda chunk: predict(chunk, workers), int(chunksize))
+            lemma_cache.save_later()
+            cache.save_later()
+        elif uploaded_file is not None:
             data = pd.read_csv(uploaded_file)
-            data['review'] = data['review'].apply(preprocess)
-            predictions = predict_data(data, vectorizer, model)
+            data['review'] = clean_series(data['review'])
+            predictions = predict(data, workers)
+            lemma_cache.save_later()
+            cache.save_later()
             data['predictions'] = predictions
             data['Sentiment_label'] = data['predictions'].map({1: 'Positive Sentiment', 0: 'Negative Sentiment'})
             st.write(data[['review', 'sentiment', 'predictions', 'Sentiment_label']])
-            display_prediction_results(data)
+            display_metrics(SentimentMetrics().update(data['sentiment'], data['predictions']))
+            if learn:
+                texts, labels = labelled_batch(data)
+                lemma_cache.save_later()
+                if not len(labels):
+                    st.warning("No rows have a 0/1 sentiment label, so the online model was not updated.")
+                else:
+                    result = store.update(texts, labels)
+                    baseline = 'n/a' if result.baseline_accuracy is None else f"{result.baseline_accuracy:.2%}"
+                    verdict = "promoted" if result.promoted else "not promoted: holdout accuracy dropped"
+                    st.info(f"Online model v{result.version} {verdict} (trained on {result.trained_rows} rows, "
+                            f"holdout accuracy {baseline} -> {result.candidate_accuracy:.2%} on {result.holdout_rows} rows)")
         elif text_input:
             processed_text = preprocess(text_input)
-            prediction = predict_data(processed_text, vectorizer, model)
+            prediction = predict(processed_text)
             sentiment = 'Positive Sentiment' if prediction[0] == 1 else 'Negative Sentiment'
             st.write("Prediction:", sentiment)
+        stats = cache.stats()
+        st.caption(f"Prediction cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.1%}), {stats['size']}/{stats['maxsize']} entries")
+        stats = lemma_cache.stats()
+        st.caption(f"Lemma cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.1%}), {stats['size']}/{stats['maxsize']} entries")
+
+@profiling.timed()
+class SessionFile:
+    """A temporary file removed once nothing refers to it: when the session
+    holding it ends, it is replaced, or the server exits."""
+
+    def __init__(self, suffix):
+        fd, self.path = tempfile.mkstemp(suffix=suffix)
+        os.close(fd)
+        weakref.finalize(self, os.remove, self.path)
 
-def display_prediction_results(data):
-    actual_sentiments = data['sentiment'].value_counts().sort_index()
-    predicted_sentiments = data['predictions'].value_counts().sort_index()
-    comparison_df = pd.DataFrame({'Actual Sentiments': actual_sentiments, 'Predicted Sentiments': predicted_sentiments})
+    def read(self):
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+def handle_streaming_prediction(uploaded_file, predict, chunksize):
+    progress_bar = st.progress(0.0, text="Scoring uploaded file...")
+    def update_progress(fraction, rows):
+        progress_bar.progress(fraction, text=f"Scored {rows} rows")
+    # Kept for the session, so the download can read it after this run ends.
+    output_file = st.session_state['streamed_predictions'] = SessionFile('.csv.gz')
+    with gzip.open(output_file.path, 'wt', newline='') as output:
+        rows, metrics = stream_predictions(uploaded_file, predict, output, chunksize, update_progress)
+    st.write(pd.read_csv(output_file.path, nrows=1000))
+    # Streamlit serves a download from memory, so the output is gzipped and
+    # only read when the button is clicked.
+    st.download_button("Download predictions (gzipped CSV)", output_file.read, file_name='predictions.csv.gz', mime='application/gzip', on_click='ignore')
+    st.caption(f"Scored {rows} rows in chunks of {chunksize}. Streamlit holds the upload and the download in server memory; for larger files use python -m sentiment score.")
+    if metrics is not None:
+        display_metrics(metrics)
+
+@profiling.timed()
+def display_metrics(metrics):
+    import matplotlib.pyplot as plt
+    import plotly.express as px
+    import seaborn as sns
+    comparison_df = pd.DataFrame({'Actual Sentiments': metrics.actual_counts(), 'Predicted Sentiments': metrics.predicted_counts()})
     fig = px.bar(comparison_df, barmode='group', title='Comparison of Actual and Predicted Sentiments')
     st.plotly_chart(fig, use_container_width=True)
-    accuracy = accuracy_score(data['sentiment'], data['predictions'])
-    st.metric(label="Prediction Accuracy", value=f"{accuracy:.2%}")
-    cm = confusion_matrix(data['sentiment'], data['predictions'])
-    precision = precision_score(data['sentiment'], data['predictions'], zero_division=0)
-    recall = recall_score(data['sentiment'], data['predictions'], zero_division=0)
-    f1 = f1_score(data['sentiment'], data['predictions'], zero_division=0)
+    st.metric(label="Prediction Accuracy", value=f"{metrics.accuracy:.2%}")
     st.subheader('Confusion Matrix')
     fig_cm, ax = plt.subplots()
-    sns.heatmap(cm, annot=True, fmt='d', cmap='Blues', ax=ax)
+    sns.heatmap(metrics.counts, annot=True, fmt='d', cmap='Blues', ax=ax)
     ax.set_xlabel('Predicted Labels')
     ax.set_ylabel('True Labels')
     ax.set_title('Confusion Matrix')
     st.pyplot(fig_cm)
     st.subheader('Performance Metrics')
-    st.text(f'Precision: {precision:.2f}')
-    st.text(f'Recall: {recall:.2f}')
-    st.text(f'F1 Score: {f1:.2f}')
+    st.text(f'Precision: {metrics.precision():.2f}')
+    st.text(f'Recall: {metrics.recall():.2f}')
+    st.text(f'F1 Score: {metrics.f1():.2f}')
     st.subheader('Classification Report')
-    report = classification_report(data['sentiment'], data['predictions'], output_dict=True)
-    st.json(report)
+    st.json(metrics.classification_report())
 
+@profiling.timed(rows=len)
 def handle_dashboard_page(df):
-    df['country_name'] = df['store_location'].apply(get_country_name)     
     st.subheader('Select Year Range')
     start_year, end_year = st.slider('Select year range', min_value=2018, max_value=2024, value=(2018, 2024))
-    filtered_year_data = df[(df['date'] >= start_year) & (df['date'] <= end_year)]                
     st.subheader('Select Month Range')
     start_month, end_month = st.select_slider('Select month range', options=list(range(1, 13)), value=(1, 12))
-    filtered_month_data = filtered_year_data[(filtered_year_data['month'] >= start_month) & (filtered_year_data['month'] <= end_month)]
-    filtered_df = filtered_month_data
-    display_sentiment_summary(filtered_df)
-    display_sentiment_trends(filtered_df)
-    display_reviews_by_country(filtered_df)
-    display_country_search(filtered_df)
-
-def display_sentiment_summary(filtered_df):
-    total_sentiment_count = len(filtered_df)
-    positive_count = filtered_df[filtered_df['Actual_sentiment'] == 1].shape[0]
-    negative_count = filtered_df[filtered_df['Actual_sentiment'] == 0].shape[0]
+    resolution = st.selectbox('Trend resolution', ['auto', *TREND_RESOLUTIONS])
+    # Aggregates and figures are cached on (dataset version, period), so a
+    # rerun that leaves the ranges alone, e.g. typing in the country search,
+    # only redraws. Review rows are only looked up for example titles.
+    period = (start_year, end_year, start_month, end_month)
+    version = load_dataset_version()
+    unknown_codes = load_sentiment_cube()[1]
+    if not unknown_codes.empty:
+        with st.expander(f"{unknown_codes.sum()} reviews have store_location codes that are not ISO countries"):
+            st.table(unknown_codes.rename('reviews').rename_axis('store_location').reset_index())
+    display_sentiment_summary(version, period)
+    display_sentiment_trends(version, period, resolution)
+    display_reviews_by_country(version, period)
+    display_country_search(df, version, period)
+
+def period_cube(period):
+    return load_time_indexes()[1].view(load_sentiment_cube()[0], *period)
+
+# The builders below are pure functions of (dataset version, period, ...):
+# the version is only part of the cache key, the data comes from the cached
+# cube and word index. Each keeps at most BUILDER_CACHE_ENTRIES results
+# (a figure or word cloud image runs to a few hundred KB) for
+# BUILDER_CACHE_TTL seconds, so browsing many periods and stores cannot
+# grow the server's memory without bound.
+BUILDER_CACHE_ENTRIES = 64
+BUILDER_CACHE_TTL = 3600
+
+@st.cache_data(show_spinner=False, max_entries=BUILDER_CACHE_ENTRIES, ttl=BUILDER_CACHE_TTL)
+@profiling.timed(rows=period_rows)
+def sentiment_summary(version, period):
+    cube = period_cube(period)
+    return int(cube['positive'].sum()), int(cube['negative'].sum()), int(cube['total'].sum())
+
+@st.cache_data(show_spinner=False, max_entries=BUILDER_CACHE_ENTRIES, ttl=BUILDER_CACHE_TTL)
+@profiling.timed(rows=period_rows)
+def trend_figures(version, period, resolution):
+    import plotly.express as px
+    cube = period_cube(period)
+    if resolution == 'auto':
+        resolution = trend_resolution(cube)
+    sentiment_over_years = sentiment_by(cube, 'date')[['negative', 'positive']].rename(columns={'negative': 0, 'positive': 1})
+    fig_years = px.line(sentiment_over_years, x=sentiment_over_years.index, y=sentiment_over_years.columns, labels={'value': 'Number of Reviews', 'date': 'Year'}, title='Sentiment Over Years')
+    fig_years.update_xaxes(dtick=1, tick0=min(sentiment_over_years.index), tickvals=sentiment_over_years.index)
+    sentiment_over_time = sentiment_trend(cube, resolution).rename(columns={'negative': 0, 'positive': 1})
+    fig_months = px.line(sentiment_over_time, x=sentiment_over_time.index, y=[1, 0], labels={'value': 'Number of Reviews', resolution: resolution.title()}, title=f'Sentiment by {resolution.title()}')
+    return fig_years, fig_months
+
+@st.cache_data(show_spinner=False, max_entries=BUILDER_CACHE_ENTRIES, ttl=BUILDER_CACHE_TTL)
+@profiling.timed(rows=period_rows)
+def country_review_figures(version, period):
+    import plotly.express as px
+    reviews_by_country = sentiment_by(period_cube(period), 'country_name')['total']
+    top_reviews_by_country = reviews_by_country.nlargest(5)
+    bottom_reviews_by_country = reviews_by_country.nsmallest(5)
+    fig_top_reviews = px.bar(top_reviews_by_country, orientation='v', title="Top 5 Reviewed Countries", labels={'value':'Number of Reviews', 'index':'Country'})
+    fig_top_reviews.update_layout(xaxis_title="Country", yaxis_title="Number of Reviews")
+    fig_top_reviews.update_traces(marker_color='blue')
+    fig_bottom_reviews = px.bar(bottom_reviews_by_country, orientation='v', title="Bottom 5 Reviewed Countries", labels={'value':'Number of Reviews', 'index':'Country'})
+    fig_bottom_reviews.update_layout(xaxis_title="Country", yaxis_title="Number of Reviews")
+    fig_bottom_reviews.update_traces(marker_color='red')
+    return fig_top_reviews, fig_bottom_reviews
+
+@st.cache_data(show_spinner=False, max_entries=BUILDER_CACHE_ENTRIES, ttl=BUILDER_CACHE_TTL)
+@profiling.timed(rows=period_rows)
+def sentiment_map_figures(version, period):
+    import plotly.express as px
+    def determine_color(count):
+        if count < 100:
+            return 'red'
+        elif count < 1000:
+            return 'black'
+        elif count < 10000:
+            return 'blue'
+        else:
+            return 'orange'
+    country_sentiment_counts = sentiment_by(period_cube(period), 'country_name')[['negative', 'positive']].reset_index()
+    country_sentiment_counts['positive_color'] = country_sentiment_counts['positive'].apply(determine_color)
+    country_sentiment_counts['negative_color'] = country_sentiment_counts['negative'].apply(determine_color)
+    fig_positive = px.scatter_geo(country_sentiment_counts, locations="country_name", locationmode='country names', text="country_name", hover_name="country_name", hover_data={'positive': True, 'negative': True}, projection="natural earth", title="Positive Sentiment Reviews by Country", size_max=15, color='positive_color', color_discrete_map={'red': 'red', 'black': 'black', 'blue': 'blue', 'orange': 'orange'})
+    fig_negative = px.scatter_geo(country_sentiment_counts, locations="country_name", locationmode='country names', text="country_name", hover_name="country_name", hover_data={'positive': True, 'negative': True}, projection="natural earth", title="Negative Sentiment Reviews by Country", size_max=15, color='negative_color', color_discrete_map={'red': 'red', 'black': 'black', 'blue': 'blue', 'orange': 'orange'})
+    fig_positive.update_traces(marker=dict(size=10))
+    fig_negative.update_traces(marker=dict(size=10))
+    return fig_positive, fig_negative
+
+@st.cache_data(show_spinner=False, max_entries=BUILDER_CACHE_ENTRIES, ttl=BUILDER_CACHE_TTL)
+@profiling.timed(rows=period_rows)
+def country_sentiments(version, period):
+    """Per store_location totals and percentages, largest first."""
+    country_sentiments = sentiment_by(period_cube(period), 'store_location').rename(columns={'total': 'total_sentiments', 'positive': 'positive_sentiments', 'negative': 'negative_sentiments'})
+    country_sentiments['positive_percent'] = (country_sentiments['positive_sentiments'] / country_sentiments['total_sentiments']) * 100
+    country_sentiments['negative_percent'] = 100 - country_sentiments['positive_percent']
+    country_sentiments['country_name'] = resolve_country_names(country_sentiments.index).fillna(UNKNOWN_COUNTRY)
+    return country_sentiments.sort_values(by='total_sentiments', ascending=False).reset_index()
+
+@st.cache_data(show_spinner=False, max_entries=BUILDER_CACHE_ENTRIES, ttl=BUILDER_CACHE_TTL)
+@profiling.timed(rows=period_rows)
+def country_pie_figure(version, period, row):
+    import plotly.express as px
+    country_data = country_sentiments(version, period).loc[row]
+    return px.pie(values=[country_data['positive_percent'], country_data['negative_percent']], names=['Positive Percent', 'Negative Percent'], title=f"Sentiment Distribution for {country_data['country_name']}")
+
+@st.cache_data(show_spinner=False, max_entries=BUILDER_CACHE_ENTRIES, ttl=BUILDER_CACHE_TTL)
+@profiling.timed(rows=period_rows)
+def sentiment_percentage_figures(version, period):
+    import plotly.express as px
+    sorted_countries = country_sentiments(version, period)
+    top_positive = sorted_countries.nlargest(20, 'positive_percent')
+    top_negative = sorted_countries.nlargest(20, 'negative_percent')
+    fig_positive = px.bar(top_positive, x='positive_percent', y='country_name', orientation='h', title="Top 20 Countries by Positive Sentiment Percent", text='positive_percent')
+    fig_positive.update_layout(yaxis={'categoryorder':'total ascending'}, xaxis_title="Positive Sentiment Percent", yaxis_title="Country")
+    fig_positive.update_traces(texttemplate='%{text:.2s}%', textposition='outside')
+    fig_negative = px.bar(top_negative, x='negative_percent', y='country_name', orientation='h', title="Top 20 Countries by Negative Sentiment Percent", text='negative_percent')
+    fig_negative.update_layout(yaxis={'categoryorder':'total ascending'}, xaxis_title="Negative Sentiment Percent", yaxis_title="Country")
+    fig_negative.update_traces(texttemplate='%{text:.2s}%', textposition='outside')
+    top_10_countries = sorted_countries.head(10)
+    fig_top = px.bar(top_10_countries, x="country_name", y=["positive_percent", "negative_percent"], title="Positive and Negative Sentiment Percentages for Top 10 Countries", labels={"value": "Percentage", "variable": "Sentiment Type", "country_name": "Country"}, barmode='group')
+    fig_top.update_layout(xaxis_title="Country", yaxis_title="Sentiment Percentage", legend_title="Sentiment Type", legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
+    bottom_10_countries = sorted_countries.tail(10)
+    fig_bottom = px.bar(bottom_10_countries, x="country_name", y=["positive_percent", "negative_percent"], title="Positive and Negative Sentiment Percentages for Bottom 10 Countries", labels={"value": "Percentage", "variable": "Sentiment Type", "country_name": "Country"}, barmode='group')
+    fig_bottom.update_layout(xaxis_title="Country", yaxis_title="Sentiment Percentage", legend_title="Sentiment Type", legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
+    return fig_positive, fig_negative, fig_top, fig_bottom
+
+@st.cache_data(show_spinner=False, max_entries=BUILDER_CACHE_ENTRIES, ttl=BUILDER_CACHE_TTL)
+@profiling.timed(rows=period_rows)
+def negative_wordcloud(version, period, store_location=None):
+    """(frequencies, rendered image) for the negative titles, or ({}, None) when there are none."""
+    frequencies = load_word_index().frequencies(*period, store_location=store_location)
+    if not frequencies:
+        return frequencies, None
+    return frequencies, create_wordcloud(frequencies).to_array()
+
+@profiling.timed(rows=period_rows)
+def display_sentiment_summary(version, period):
+    positive_count, negative_count, total_sentiment_count = sentiment_summary(version, period)
     positive_percentage = (positive_count / total_sentiment_count) * 100
-    negative_percentage = (negative_count / total_sentiment_count) * 100   
-    average_sentiment = filtered_df['Actual_sentiment'].mean()
+    negative_percentage = (negative_count / total_sentiment_count) * 100
+    average_sentiment = positive_count / total_sentiment_count
     col2, col3, col4 = st.columns([3,3,1])
     with col2:
         st.metric("Positive Sentiments", f"{positive_count} ({positive_percentage:.2f}%)")
@@ -194,53 +446,30 @@ def display_sentiment_summary(filtered_df):
         st.metric("Ratio", f"{average_sentiment:.2f}")        
     st.metric(label="Total Sentiments", value=total_sentiment_count)
 
-def display_sentiment_trends(filtered_df):
-    sentiment_over_years = filtered_df.groupby('date')['Actual_sentiment'].value_counts().unstack().fillna(0)
-    fig_years = px.line(sentiment_over_years, x=sentiment_over_years.index, y=sentiment_over_years.columns, labels={'value': 'Number of Reviews', 'date': 'Year'}, title='Sentiment Over Years')
-    fig_years.update_xaxes(dtick=1, tick0=min(sentiment_over_years.index), tickvals=sentiment_over_years.index)
-    filtered_df['month'] = filtered_df['month'].astype(str).str.zfill(2)
-    filtered_df['year_month'] = filtered_df['date'].astype(str) + '-' + filtered_df['month']
-    sentiment_over_months = filtered_df.groupby(['year_month', 'Actual_sentiment']).size().unstack().fillna(0)
-    fig_months = px.line(sentiment_over_months, x=sentiment_over_months.index, y=[1, 0], labels={'value': 'Number of Reviews', 'year_month': 'Month'}, title='Sentiment Over Months')
+@profiling.timed(rows=period_rows)
+def display_sentiment_trends(version, period, resolution):
+    fig_years, fig_months = trend_figures(version, period, resolution)
     col1, col2 = st.columns(2)
     with col1:
         st.plotly_chart(fig_years, use_container_width=True)
     with col2:
         st.plotly_chart(fig_months, use_container_width=True)
 
-def display_reviews_by_country(filtered_df):
-    top_reviews_by_country = filtered_df.groupby('country_name')['Actual_sentiment'].count().nlargest(5)
-    bottom_reviews_by_country = filtered_df.groupby('country_name')['Actual_sentiment'].count().nsmallest(5)
-    fig_top_reviews = px.bar(top_reviews_by_country, orientation='v', title="Top 5 Reviewed Countries", labels={'value':'Number of Reviews', 'index':'Country'})
-    fig_top_reviews.update_layout(xaxis_title="Country", yaxis_title="Number of Reviews")
-    fig_top_reviews.update_traces(marker_color='blue')
-    fig_bottom_reviews = px.bar(bottom_reviews_by_country, orientation='v', title="Bottom 5 Reviewed Countries", labels={'value':'Number of Reviews', 'index':'Country'})
-    fig_bottom_reviews.update_layout(xaxis_title="Country", yaxis_title="Number of Reviews")
-    fig_bottom_reviews.update_traces(marker_color='red')
+@profiling.timed(rows=period_rows)
+def display_reviews_by_country(version, period):
+    fig_top_reviews, fig_bottom_reviews = country_review_figures(version, period)
     col1, col2 = st.columns(2)
     with col1:
         st.plotly_chart(fig_top_reviews, use_container_width=True)
     with col2:
         st.plotly_chart(fig_bottom_reviews, use_container_width=True)
     if st.button('Show Word Cloud for worst concerning words'):
-        show_wordcloud_for_negative_reviews(filtered_df)
-    display_sentiment_map(filtered_df)
+        show_wordcloud_for_negative_reviews(version, period)
+    display_sentiment_map(version, period)
 
-def display_sentiment_map(filtered_df):
-    def determine_color(count):
-        if count < 100:
-            return 'red'
-        elif count < 1000:
-            return 'black'
-        elif count < 10000:
-            return 'blue'
-        else:
-            return 'orange'
-    country_sentiment_counts = filtered_df.groupby('country_name')['Actual_sentiment'].value_counts().unstack(fill_value=0)
-    country_sentiment_counts.columns = ['negative', 'positive'] if 0 in country_sentiment_counts.columns else ['positive']
-    country_sentiment_counts.reset_index(inplace=True)
-    country_sentiment_counts['positive_color'] = country_sentiment_counts['positive'].apply(determine_color)
-    country_sentiment_counts['negative_color'] = country_sentiment_counts['negative'].apply(determine_color) if 'negative' in country_sentiment_counts.columns else 'black'
+@profiling.timed(rows=period_rows)
+def display_sentiment_map(version, period):
+    fig_positive, fig_negative = sentiment_map_figures(version, period)
     color_legend = """
     #### Color Legend:
     - **Red**: Less than 100 counts
@@ -248,10 +477,6 @@ def display_sentiment_map(filtered_df):
     - **Blue**: Less than 10,000 counts
     - **Orange**: Above 10,000 counts
     """
-    fig_positive = px.scatter_geo(country_sentiment_counts, locations="country_name", locationmode='country names', text="country_name", hover_name="country_name", hover_data={'positive': True, 'negative': True}, projection="natural earth", title="Positive Sentiment Reviews by Country", size_max=15, color='positive_color', color_discrete_map={'red': 'red', 'black': 'black', 'blue': 'blue', 'orange': 'orange'})
-    fig_negative = px.scatter_geo(country_sentiment_counts, locations="country_name", locationmode='country names', text="country_name", hover_name="country_name", hover_data={'positive': True, 'negative': True}, projection="natural earth", title="Negative Sentiment Reviews by Country", size_max=15, color='negative_color', color_discrete_map={'red': 'red', 'black': 'black', 'blue': 'blue', 'orange': 'orange'})
-    fig_positive.update_traces(marker=dict(size=10))
-    fig_negative.update_traces(marker=dict(size=10))
     col1, col2 = st.columns([3, 1])
     with col1:
         st.subheader('Positive Sentiment Map')
@@ -261,24 +486,18 @@ def display_sentiment_map(filtered_df):
     with col2:
         st.markdown(color_legend, unsafe_allow_html=True)
 
-def display_country_search(filtered_df):
-    country_sentiments = filtered_df.groupby('store_location')['Actual_sentiment'].agg(total_sentiments='count', positive_sentiments='sum')
-    country_sentiments['positive_percent'] = (country_sentiments['positive_sentiments'] / country_sentiments['total_sentiments']) * 100
-    country_sentiments['negative_percent'] = 100 - country_sentiments['positive_percent']
-    country_sentiments['negative_sentiments'] = country_sentiments['total_sentiments'] - country_sentiments['positive_sentiments']
-    country_sentiments['country_name'] = country_sentiments.index.map(get_country_name)
-    sorted_countries = country_sentiments.sort_values(by='total_sentiments', ascending=False).reset_index()
+@profiling.timed(rows=search_rows)
+def display_country_search(df, version, period):
+    sorted_countries = country_sentiments(version, period)
     st.subheader('Search for a Country')
     search_query = st.text_input('Enter country name').lower()
     if search_query:
         search_results = sorted_countries[sorted_countries['country_name'].str.lower().str.contains(search_query)]
         if not search_results.empty:
             country_data = search_results.iloc[0]
-            store_location = country_data['store_location']
-            country_reviews = filtered_df[filtered_df['store_location'] == store_location]
-            total_positive_sentiment = country_reviews[country_reviews['Actual_sentiment'] == 1].shape[0]
-            total_negative_sentiment = country_reviews[country_reviews['Actual_sentiment'] == 0].shape[0]
-            total_sentiments = country_reviews.shape[0]
+            total_positive_sentiment = country_data['positive_sentiments']
+            total_negative_sentiment = country_data['negative_sentiments']
+            total_sentiments = country_data['total_sentiments']
             col1, col2, col3 = st.columns(3)
             with col1:
                 st.metric("Total Positive Sentiment", total_positive_sentiment)
@@ -286,70 +505,55 @@ def display_country_search(filtered_df):
                 st.metric("Total Negative Sentiment", total_negative_sentiment)
             with col3:
                 st.metric("Total Sentiment", total_sentiments)
-            fig = px.pie(values=[country_data['positive_percent'], country_data['negative_percent']], names=['Positive Percent', 'Negative Percent'], title=f"Sentiment Distribution for {country_data['country_name']}")
-            st.plotly_chart(fig)
-            display_negative_reviews(filtered_df, country_data)
+            st.plotly_chart(country_pie_figure(version, period, country_data.name))
+            display_negative_reviews(df, version, period, country_data)
         else:
             st.warning("No countries found matching the search query.")
     else:
         search_results = sorted_countries.head(20)
     st.subheader('Countries by Sentiment Count')
     st.table(search_results[['country_name', 'store_location', 'total_sentiments', 'positive_percent', 'negative_percent']])
-    display_sentiment_percentages(sorted_countries)
+    display_sentiment_percentages(version, period)
 
-def display_negative_reviews(filtered_df, country_data):
-    negative_reviews = filtered_df[(filtered_df['store_location'] == country_data['store_location']) & (filtered_df['Actual_sentiment'] == 0)]
-    if not negative_reviews.empty:
+@profiling.timed(rows=search_rows)
+def display_negative_reviews(df, version, period, country_data):
+    import matplotlib.pyplot as plt
+    if country_data['negative_sentiments'] > 0:
         button_key = f"show_wordcloud_{country_data['store_location']}"
         if st.button('Show concerning words for the above country', key=button_key):
-            if negative_reviews['title'].isna().all():
+            frequencies, image = negative_wordcloud(version, period, country_data['store_location'])
+            if image is None:
                 st.error("No titles available to generate a word cloud.")
             else:
-                titles = negative_reviews['title'].dropna()
-                wordcloud = WordCloud(width=800, height=400, background_color='white').generate(' '.join(titles))
                 plt.figure(figsize=(10, 5))
-                plt.imshow(wordcloud, interpolation='bilinear')
+                plt.imshow(image, interpolation='bilinear')
                 plt.axis("off")
                 plt.title("Word Cloud for Negative Sentiments")
                 st.pyplot(plt)
-                top_words = list(wordcloud.words_.keys())[:5]
+                top_words = list(frequencies)[:5]
                 st.subheader("Titles containing top words from the word cloud:")
+                word_index = load_word_index()
+                time_index = load_time_indexes()[0]
                 for word in top_words:
-                    relevant_titles = titles[titles.str.contains(word, case=False, na=False)]
+                    # Posting lists only hold negative reviews, in dataset order; the
+                    # time index narrows them to the period by binary search, and only
+                    # those candidates' store codes are compared.
+                    positions = time_index.select(word_index.reviews_with(word), *period)
+                    in_country = (df['store_location'].take(positions) == country_data['store_location']).to_numpy(dtype=bool, na_value=False)
+                    relevant_titles = df['title'].take(positions[in_country][:5])
                     st.markdown(f"#### Titles containing the word: **{word}**")
-                    for title in relevant_titles.head(5):
+                    for title in relevant_titles:
                         st.write(title)
     else:
         st.warning("No negative reviews found. Please adjust your search or selection.")
 
-def display_sentiment_percentages(sorted_countries):
-    top_positive = sorted_countries.nlargest(20, 'positive_percent')
-    top_negative = sorted_countries.nlargest(20, 'negative_percent')
-    fig_positive = px.bar(top_positive, x='positive_percent', y='country_name', orientation='h', title="Top 20 Countries by Positive Sentiment Percent", text='positive_percent')
-    fig_positive.update_layout(yaxis={'categoryorder':'total ascending'}, xaxis_title="Positive Sentiment Percent", yaxis_title="Country")
-    fig_positive.update_traces(texttemplate='%{text:.2s}%', textposition='outside')
-    fig_negative = px.bar(top_negative, x='negative_percent', y='country_name', orientation='h', title="Top 20 Countries by Negative Sentiment Percent", text='negative_percent')
-    fig_negative.update_layout(yaxis={'categoryorder':'total ascending'}, xaxis_title="Negative Sentiment Percent", yaxis_title="Country")
-    fig_negative.update_traces(texttemplate='%{text:.2s}%', textposition='outside')
+@profiling.timed(rows=period_rows)
+def display_sentiment_percentages(version, period):
+    fig_positive, fig_negative, fig_top, fig_bottom = sentiment_percentage_figures(version, period)
     st.plotly_chart(fig_positive, use_container_width=True)
     st.plotly_chart(fig_negative, use_container_width=True)
-    top_10_countries = sorted_countries.head(10)
-    fig = px.bar(top_10_countries, x="country_name", y=["positive_percent", "negative_percent"], title="Positive and Negative Sentiment Percentages for Top 10 Countries", labels={"value": "Percentage", "variable": "Sentiment Type", "country_name": "Country"}, barmode='group')
-    fig.update_layout(xaxis_title="Country", yaxis_title="Sentiment Percentage", legend_title="Sentiment Type", legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
-    st.plotly_chart(fig, use_container_width=True)
-    bottom_10_countries = sorted_countries.tail(10)
-    fig = px.bar(bottom_10_countries, x="country_name", y=["positive_percent", "negative_percent"], title="Positive and Negative Sentiment Percentages for Bottom 10 Countries", labels={"value": "Percentage", "variable": "Sentiment Type", "country_name": "Country"}, barmode='group')
-    fig.update_layout(xaxis_title="Country", yaxis_title="Sentiment Percentage", legend_title="Sentiment Type", legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
-    st.plotly_chart(fig, use_container_width=True)
-
-def predict_data(input_data, vectorizer, model):
-    if isinstance(input_data, pd.DataFrame):
-        text_data = input_data['review'].apply(lambda x: lemmatize_text(preprocess(x)))
-    else:
-        text_data = pd.Series([lemmatize_text(preprocess(input_data))])
-    text_features = vectorizer.transform(text_data)
-    predictions = model.predict(text_features)
-    return predictions
+    st.plotly_chart(fig_top, use_container_width=True)
+    st.plotly_chart(fig_bottom, use_container_width=True)
 
 if __name__ == "__main__":
     main()
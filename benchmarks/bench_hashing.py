@@ -0,0 +1,57 @@
+import argparse
+import os
+import tempfile
+import tracemalloc
+
+import joblib
+
+from benchmarks.timing import best_of
+from sentiment.artifacts import fetch_artifact
+from sentiment.train import holdout_split, train, training_data
+
+
+def load_footprint(paths):
+    """Bytes still allocated after loading ``paths``, i.e. what each process holds."""
+    tracemalloc.start()
+    objects = [joblib.load(path) for path in paths]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return current
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the TF-IDF vectorizer with hashing at several dimensionalities.")
+    parser.add_argument('--dataset', help="labelled review CSV; defaults to the cached dataset artifact")
+    parser.add_argument('--n-features', type=int, nargs='+', default=[2 ** 16, 2 ** 18, 2 ** 20])
+    parser.add_argument('--holdout', type=float, default=0.2)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    texts, labels = training_data(args.dataset or fetch_artifact('dataset'), args.workers)
+    _, test_rows = holdout_split(len(texts), args.holdout)
+    test_texts = texts[test_rows]
+    configs = [('tfidf', None)] + [('hashing', n_features) for n_features in args.n_features]
+
+    print(f"{len(texts)} reviews, {len(test_texts)} held out")
+    print(f"{'mode':<16} {'on disk':>10} {'in memory':>10} {'load':>9} {'texts/s':>10} {'accuracy':>9}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for mode, n_features in configs:
+            kwargs = {'n_features': n_features} if n_features else {}
+            vectorizer, model, accuracy = train(texts, labels, mode, holdout=args.holdout, **kwargs)
+            paths = [os.path.join(tmp_dir, f"{mode}-{n_features}-{name}.joblib") for name in ('vectorizer', 'model')]
+            joblib.dump(vectorizer, paths[0])
+            joblib.dump(model, paths[1])
+
+            size = sum(os.path.getsize(path) for path in paths)
+            footprint = load_footprint(paths)
+            load_time, _ = best_of(lambda: [joblib.load(path) for path in paths], args.repeat)
+            score_time, _ = best_of(lambda: model.predict(vectorizer.transform(test_texts)), args.repeat)
+            label = mode if n_features is None else f"hashing {n_features}"
+            print(f"{label:<16} {size / 1024:8.0f}KB {footprint / 1024:8.0f}KB {load_time * 1000:7.1f}ms "
+                  f"{len(test_texts) / score_time:10.0f} {accuracy:9.2%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+import argparse
+import random
+import time
+
+import numpy as np
+
+from benchmarks.timing import best_of
+from sentiment.artifacts import fetch_artifact
+from sentiment.kernel import LinearKernel
+from sentiment.predict import load_artifacts
+
+
+def make_texts(vectorizer, rows, seed=0):
+    """Normalized-looking reviews drawn from the vocabulary plus some unknown words."""
+    rng = random.Random(seed)
+    words = sorted(vectorizer.vocabulary_)[:5000] + ["qzxunknown", "the", "and"]
+    texts = [' '.join(rng.choices(words, k=rng.randint(0, 40))) for _ in range(rows)]
+    texts[0] = ''
+    return texts
+
+
+def latencies(func, texts):
+    timings = []
+    for text in texts:
+        start = time.perf_counter()
+        func(text)
+        timings.append(time.perf_counter() - start)
+    return np.array(timings)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parity and latency of LinearKernel against vectorizer.transform + model.predict.")
+    parser.add_argument('--vectorizer', help="defaults to the cached vectorizer artifact")
+    parser.add_argument('--model', help="defaults to the cached model artifact")
+    parser.add_argument('--rows', type=int, default=10_000, help="texts for the parity check and batch timing")
+    parser.add_argument('--single', type=int, default=2_000, help="texts scored one at a time")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    vectorizer, model = load_artifacts(args.vectorizer or fetch_artifact('vectorizer'), args.model or fetch_artifact('model'), mmap=True)
+    kernel = LinearKernel(vectorizer, model)
+    texts = make_texts(vectorizer, args.rows)
+
+    expected = model.decision_function(vectorizer.transform(texts))
+    actual = kernel.decision_function(texts)
+    mismatches = int((model.predict(vectorizer.transform(texts)) != kernel.predict(texts)).sum())
+    print(f"parity:  {args.rows} texts, {mismatches} label mismatches, max |decision diff| {np.abs(expected - actual).max():.2e}")
+
+    single = texts[:args.single]
+    sklearn_single = latencies(lambda text: model.predict(vectorizer.transform([text])), single)
+    kernel_single = latencies(kernel.predict_one, single)
+    for name, timings in (('sklearn', sklearn_single), ('kernel', kernel_single)):
+        p50, p99 = np.percentile(timings, [50, 99]) * 1e6
+        print(f"single {name:<8} p50 {p50:8.1f} us  p99 {p99:8.1f} us")
+
+    sklearn_batch, _ = best_of(lambda: model.predict(vectorizer.transform(texts)), args.repeat)
+    kernel_batch, _ = best_of(lambda: kernel.predict(texts), args.repeat)
+    print(f"batch  sklearn  {args.rows / sklearn_batch:10.0f} texts/s")
+    print(f"batch  kernel   {args.rows / kernel_batch:10.0f} texts/s")
+    print(f"single-text p50 speedup: {np.median(sklearn_single) / np.median(kernel_single):.1f}x, batch speedup: {sklearn_batch / kernel_batch:.1f}x")
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,39 @@
+import argparse
+import random
+
+import pandas as pd
+
+from benchmarks.timing import best_of
+from sentiment.text import clean_series, preprocess
+
+WORDS = ["great", "shirt", "love", "it's", "fast", "shipping", "size", "wrong", "colour", "faded",
+         "10/10", "5*", "A+++", "print_quality", "très", "bien", "😀", "!!!", "2nd", "order"]
+
+
+def make_reviews(rows, seed=0):
+    rng = random.Random(seed)
+    reviews = [' '.join(rng.choices(WORDS, k=rng.randint(3, 30))) for _ in range(rows)]
+    for i in range(0, rows, 50):
+        reviews[i] = None
+    return pd.Series(reviews, dtype=object)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare scalar preprocess with clean_series.")
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    reviews = make_reviews(args.rows)
+    # tests/test_text.py checks that both give the same strings.
+    scalar_time, _ = best_of(lambda: reviews.apply(preprocess), args.repeat)
+    column_time, _ = best_of(lambda: clean_series(reviews), args.repeat)
+
+    print(f"rows:                     {args.rows}")
+    print(f"Series.apply(preprocess): {scalar_time:.3f}s")
+    print(f"clean_series:             {column_time:.3f}s")
+    print(f"speedup:                  {scalar_time / column_time:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
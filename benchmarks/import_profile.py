@@ -0,0 +1,54 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must stay out of the Streamlit cold start; each is imported by
+# the page or widget that needs it. Anything streamlit itself imports (it pulls
+# in plotly, for one) is outside our control and not counted.
+DEFERRED_MODULES = ['plotly', 'seaborn', 'matplotlib', 'wordcloud', 'sklearn', 'nltk', 'pycountry']
+
+
+def profile_import(module):
+    """Run ``python -X importtime -c 'import module'`` and return {top-level package: self time in us}."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=REPO_DIR, capture_output=True, text=True, check=True,
+    )
+    packages = defaultdict(int)
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, _, name = (part.strip() for part in line[len('import time:'):].split('|'))
+        packages[name.split('.')[0]] += int(self_us)
+    return dict(packages)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import-time profile of the Streamlit app module.")
+    parser.add_argument('--module', default='appp')
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--json', action='store_true', help="print the profile as JSON")
+    args = parser.parse_args(argv)
+
+    packages = profile_import(args.module)
+    streamlit_packages = profile_import('streamlit')
+    eager = [name for name in DEFERRED_MODULES if name in packages and name not in streamlit_packages]
+    if args.json:
+        print(json.dumps({'module': args.module, 'packages_us': packages, 'eager_deferred_modules': eager}, indent=2))
+    else:
+        total = sum(packages.values())
+        print(f"import {args.module}: {total / 1000:.1f} ms")
+        for name, self_us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+            print(f"  {name:<24} {self_us / 1000:8.1f} ms")
+        if eager:
+            print(f"imported at startup but should be deferred: {', '.join(eager)}")
+    return 1 if eager else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
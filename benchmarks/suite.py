@@ -0,0 +1,345 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+import sklearn
+
+from benchmarks.timing import best_of
+from sentiment.artifacts import ensure_nltk_data
+from sentiment.countries import UNKNOWN_COUNTRY, resolve_country_names, unknown_code_counts
+from sentiment.cube import build_sentiment_cube, review_mask
+from sentiment.ingest import apply_dtype_schema, normalize_frame, read_only
+from sentiment.kernel import linear_kernel
+from sentiment.lemma_cache import lemma_cache
+from sentiment.predict import load_artifacts, predict_data
+from sentiment.text import clean_series, lemmatize_text, preprocess
+from sentiment.time_index import TimeIndex
+from sentiment.train import train
+from sentiment.word_index import WordIndex
+
+SIZES = (10_000, 100_000, 1_000_000)
+REPORT_DIR = os.path.join('.cache', 'benchmarks')
+DEFAULT_REPORT = os.path.join(REPORT_DIR, 'latest.json')
+DEFAULT_BASELINE = os.path.join(REPORT_DIR, 'baseline.json')
+# A benchmark this many times slower than its baseline counts as a regression.
+DEFAULT_THRESHOLD = 1.25
+# Lemmatization runs at a few thousand texts per second, so the text stages
+# are timed on at most this many rows of each dataset.
+DEFAULT_TEXT_ROWS = 10_000
+FULL_PERIOD = (2018, 2024, 1, 12)
+# Two years, six months each: a slice per year through the time index.
+NARROW_PERIOD = (2021, 2022, 3, 8)
+
+POSITIVE_WORDS = ["great", "love", "loved", "perfect", "soft", "fast", "shipping", "beautiful", "recommend", "quality", "happy", "fits"]
+NEGATIVE_WORDS = ["awful", "faded", "wrong", "size", "late", "never", "arrived", "cheap", "cracked", "refund", "disappointed", "poor"]
+NEUTRAL_WORDS = ["shirt", "print", "order", "design", "colour", "hoodie", "mug", "gift", "the", "was", "and", "it"]
+NOISE = ["!!", "10/10", "5*", "A+++", "2nd", "😀", "très"]
+# Mostly ISO codes, plus codes the country table cannot resolve and blanks.
+STORE_LOCATIONS = ["US", "GB", "DE", "FR", "CA", "AU", "NL", "SE", "IT", "ES", "XK", "ZZ", None]
+
+
+def make_dataset(rows, seed=0):
+    """A Teepublic_review.csv-shaped frame whose labels follow the word choice."""
+    rng = random.Random(seed)
+    sentiments = [rng.random() < 0.5 for _ in range(rows)]
+
+    def text(positive, low, high):
+        vocabulary = POSITIVE_WORDS if positive else NEGATIVE_WORDS
+        words = [rng.choice(vocabulary) if rng.random() < 0.6 else rng.choice(NEUTRAL_WORDS) for _ in range(rng.randint(low, high))]
+        if rng.random() < 0.2:
+            words.append(rng.choice(NOISE))
+        return ' '.join(words)
+
+    reviews = [text(positive, 3, 30) for positive in sentiments]
+    titles = [text(positive, 1, 5) for positive in sentiments]
+    for i in range(0, rows, 97):
+        reviews[i] = None
+    numbers = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'title': titles,
+        'review': reviews,
+        'store_location': numbers.choice(np.array(STORE_LOCATIONS, dtype=object), rows),
+        'date': numbers.integers(2018, 2025, rows),
+        'month': numbers.integers(1, 13, rows),
+        'Actual_sentiment': np.array(sentiments, dtype=np.int64),
+    })
+
+
+class StreamlitStub:
+    """Stands in for the ``streamlit`` module so the page functions run without a server.
+
+    Layout calls return the stub itself, which works as a context manager;
+    widgets return their default value, or ``text_input``/``button`` as
+    configured; every other call does nothing.
+    """
+
+    def __init__(self, text_input='', button=False):
+        self._text_input = text_input
+        self._button = button
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    @property
+    def sidebar(self):
+        return self
+
+    def columns(self, spec, **kwargs):
+        return [self] * (spec if isinstance(spec, int) else len(spec))
+
+    def expander(self, *args, **kwargs):
+        return self
+
+    def slider(self, label, min_value=None, max_value=None, value=None, **kwargs):
+        return value
+
+    def select_slider(self, label, options=(), value=None, **kwargs):
+        return value
+
+    def selectbox(self, label, options, index=0, **kwargs):
+        return list(options)[index]
+
+    def text_input(self, *args, **kwargs):
+        return self._text_input
+
+    def button(self, *args, **kwargs):
+        return self._button
+
+
+def missing_nltk_data():
+    """Why the lemmatizing stages cannot run here, or None when the NLTK data is available."""
+    try:
+        ensure_nltk_data()
+    except (ImportError, LookupError) as exc:
+        return f"NLTK data unavailable: {exc}"
+    return None
+
+
+def synthetic_model(reviews, labels):
+    """A TF-IDF LinearSVC fitted on the synthetic reviews, so the suite needs no downloads."""
+    vectorizer, model, _ = train(np.asarray(reviews, dtype=object), np.asarray(labels), holdout=0)
+    return vectorizer, model
+
+
+def dashboard_data(raw):
+    """The frame, cube and word index the dashboard's cached loaders would return."""
+    df = read_only(apply_dtype_schema(normalize_frame(raw.copy())))
+    cube = build_sentiment_cube(df)
+    names = resolve_country_names(cube['store_location'])
+    unknown_codes = unknown_code_counts(cube['store_location'], names, cube['total'])
+    cube['country_name'] = names.fillna(UNKNOWN_COUNTRY)
+    return df, cube, unknown_codes, WordIndex.build(df)
+
+
+def run_size(rows, args, vectorizer, model, record, text_skipped=None):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    from streamlit.logger import set_log_level
+    # cache_data warns on every call when there is no Streamlit runtime.
+    set_log_level('error')
+
+    import appp
+
+    raw = make_dataset(rows, args.seed)
+    text_rows = rows if not args.text_rows else min(rows, args.text_rows)
+    reviews = raw['review']
+    record('preprocess', rows, lambda: reviews.map(preprocess))
+    record('clean_series', rows, lambda: clean_series(reviews))
+
+    sample = clean_series(reviews.head(text_rows)).tolist()
+
+    def lemmatize_cold():
+        lemma_cache.clear()
+        for text in sample:
+            lemmatize_text(text)
+    # These stages lemmatize, so without the NLTK data they are reported as
+    # skipped instead of aborting the run.
+    record('lemmatize_text', text_rows, lemmatize_cold, skipped=text_skipped)
+
+    batch = raw.head(text_rows)
+    kernel = linear_kernel(vectorizer, model)
+    singles = reviews.head(args.single).fillna('').tolist()
+    record('predict_data/single', len(singles), lambda: [predict_data(text, vectorizer, model) for text in singles], skipped=text_skipped)
+    record('predict_data/batch', text_rows, lambda: predict_data(batch, vectorizer, model), skipped=text_skipped)
+    if kernel is not None:
+        record('predict_data/single_kernel', len(singles), lambda: [predict_data(text, vectorizer, model, kernel=kernel) for text in singles], skipped=text_skipped)
+        record('predict_data/batch_kernel', text_rows, lambda: predict_data(batch, vectorizer, model, kernel=kernel), skipped=text_skipped)
+
+    df, cube, unknown_codes, word_index = dashboard_data(raw)
+    record('build_sentiment_cube', rows, lambda: build_sentiment_cube(df))
+    record('word_index/build', rows, lambda: WordIndex.build(df))
+    frequencies = word_index.frequencies(*FULL_PERIOD)
+    record('word_index/frequencies', rows, lambda: word_index.frequencies(*FULL_PERIOD))
+    record('wordcloud/render', rows, lambda: appp.create_wordcloud(frequencies))
+
+    time_index, cube_index = TimeIndex.build(df), TimeIndex.build(cube)
+    record('time_index/build', rows, lambda: TimeIndex.build(df))
+    record('filter/review_mask', rows, lambda: df[review_mask(df, *NARROW_PERIOD)])
+    record('filter/time_index', rows, lambda: time_index.view(df, *NARROW_PERIOD))
+    record('filter/time_index_years', rows, lambda: time_index.view(df, 2021, 2022, 1, 12))
+
+    country = cube.groupby('store_location', observed=True)['negative'].sum().idxmax()
+    country_data = pd.Series({'store_location': country, 'negative_sentiments': 1})
+    version = f"synthetic-{rows}-{args.seed}"
+
+    def page(func, *func_args, cold=True, **stub_args):
+        def call():
+            # Cold runs clear st.cache_data so the figures are rebuilt; warm
+            # runs measure a rerun whose filters did not change.
+            if cold:
+                appp.st.cache_data.clear()
+            with mock.patch.multiple(appp, st=StreamlitStub(**stub_args), load_word_index=lambda: word_index,
+                                     load_sentiment_cube=lambda: (cube, unknown_codes), load_dataset_version=lambda: version,
+                                     load_time_indexes=lambda: (time_index, cube_index)):
+                func(*func_args)
+            plt.close('all')
+        return call
+
+    record('display_sentiment_summary', rows, page(appp.display_sentiment_summary, version, FULL_PERIOD))
+    record('display_sentiment_trends', rows, page(appp.display_sentiment_trends, version, FULL_PERIOD, 'month'))
+    record('display_reviews_by_country', rows, page(appp.display_reviews_by_country, version, FULL_PERIOD))
+    record('display_sentiment_map', rows, page(appp.display_sentiment_map, version, FULL_PERIOD))
+    record('display_country_search', rows, page(appp.display_country_search, df, version, FULL_PERIOD, text_input='united'))
+    record('display_negative_reviews', rows, page(appp.display_negative_reviews, df, version, FULL_PERIOD, country_data, button=True))
+    record('display_sentiment_percentages', rows, page(appp.display_sentiment_percentages, version, FULL_PERIOD))
+    record('show_wordcloud_for_negative_reviews', rows, page(appp.show_wordcloud_for_negative_reviews, version, FULL_PERIOD))
+    record('handle_dashboard_page', rows, page(appp.handle_dashboard_page, df))
+    record('handle_dashboard_page/warm', rows, page(appp.handle_dashboard_page, df, cold=False))
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'sklearn': sklearn.__version__,
+    }
+
+
+def compare(report, baseline, threshold):
+    """Rows of (name, rows, seconds, baseline seconds, ratio, status) for every benchmark in ``report``."""
+    previous = {(result['name'], result['rows']): result['seconds'] for result in baseline['results']}
+    comparisons = []
+    for result in report['results']:
+        before = previous.get((result['name'], result['rows']))
+        if result['seconds'] is None:
+            comparisons.append((result['name'], result['rows'], None, before, None, 'skipped'))
+            continue
+        if before is None:
+            comparisons.append((result['name'], result['rows'], result['seconds'], None, None, 'new'))
+            continue
+        ratio = result['seconds'] / before if before else float('inf')
+        if ratio > threshold:
+            status = 'regression'
+        elif ratio < 1 / threshold:
+            status = 'improvement'
+        else:
+            status = 'ok'
+        comparisons.append((result['name'], result['rows'], result['seconds'], before, ratio, status))
+    return comparisons
+
+
+def write_json(path, payload):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the prediction and dashboard hot paths on synthetic data and compare with a baseline.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(SIZES), help="dataset rows to generate")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per benchmark; the fastest is reported")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--text-rows', type=int, default=DEFAULT_TEXT_ROWS, help="cap on rows for lemmatize_text and batch predict_data (0 for no cap)")
+    parser.add_argument('--single', type=int, default=200, help="texts scored one at a time for the single-text latency")
+    parser.add_argument('--artifacts', action='store_true', help="score with the shipped vectorizer and model instead of one fitted on the synthetic data")
+    parser.add_argument('--only', nargs='+', help="run only benchmarks whose name starts with one of these prefixes")
+    parser.add_argument('--output', default=DEFAULT_REPORT, help="where to write the JSON report")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="report to compare against, if it exists")
+    parser.add_argument('--update-baseline', action='store_true', help="also store this report as the baseline")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help="slowdown ratio reported as a regression")
+    parser.add_argument('--fail-on-regression', action='store_true', help="exit with status 1 if any benchmark regressed")
+    args = parser.parse_args(argv)
+
+    if args.artifacts:
+        from sentiment.artifacts import fetch_artifact
+        vectorizer, model = load_artifacts(fetch_artifact('vectorizer'), fetch_artifact('model'))
+    else:
+        training = make_dataset(min(max(args.sizes), DEFAULT_TEXT_ROWS), args.seed + 1)
+        vectorizer, model = synthetic_model(clean_series(training['review']), training['Actual_sentiment'])
+
+    text_skipped = missing_nltk_data()
+    if text_skipped:
+        print(f"warning: {text_skipped}; lemmatize_text and predict_data are reported as skipped", file=sys.stderr)
+
+    results = []
+
+    def record(name, rows, func, skipped=None):
+        if args.only and not name.startswith(tuple(args.only)):
+            return
+        if skipped:
+            results.append({'name': name, 'rows': rows, 'seconds': None, 'rows_per_second': None, 'skipped': skipped})
+            print(f"{rows:>9} {name:<36} {'skipped':>12}", flush=True)
+            return
+        seconds, _ = best_of(func, args.repeat)
+        results.append({'name': name, 'rows': rows, 'seconds': seconds, 'rows_per_second': rows / seconds if seconds else None})
+        print(f"{rows:>9} {name:<36} {seconds * 1000:10.1f}ms", flush=True)
+
+    for size in args.sizes:
+        run_size(size, args, vectorizer, model, record, text_skipped)
+
+    report = {
+        'created': time.time(),
+        'environment': environment(),
+        'config': {'sizes': args.sizes, 'repeat': args.repeat, 'seed': args.seed, 'text_rows': args.text_rows,
+                   'single': args.single, 'model': 'artifacts' if args.artifacts else 'synthetic'},
+        'results': results,
+    }
+    write_json(args.output, report)
+    print(f"Wrote {args.output}")
+
+    regressions = 0
+    if os.path.exists(args.baseline) and not args.update_baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline['environment'] != report['environment'] or baseline['config'] != report['config']:
+            print("warning: baseline was recorded with a different environment or configuration", file=sys.stderr)
+        print(f"\n{'rows':>9} {'benchmark':<36} {'now':>10} {'baseline':>10} {'ratio':>7}")
+        for name, rows, seconds, before, ratio, status in compare(report, baseline, args.threshold):
+            now_text = '-' if seconds is None else f"{seconds * 1000:8.1f}ms"
+            before_text = '-' if before is None else f"{before * 1000:8.1f}ms"
+            ratio_text = '-' if ratio is None else f"{ratio:6.2f}x"
+            print(f"{rows:>9} {name:<36} {now_text:>10} {before_text:>10} {ratio_text:>7}  {status}")
+            regressions += status == 'regression'
+        print(f"{regressions} regression(s) beyond {args.threshold:.2f}x")
+    if args.update_baseline:
+        write_json(args.baseline, report)
+        print(f"Stored baseline {args.baseline}")
+    if args.fail_on_regression and regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,11 @@
+import time
+
+
+def best_of(func, repeat):
+    """Fastest of ``repeat`` calls to ``func`` in seconds, and the last call's result."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
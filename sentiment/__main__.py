@@ -0,0 +1,272 @@
+import argparse
+import os
+import sys
+import time
+
+import joblib
+import pandas as pd
+
+from sentiment import profiling
+from sentiment.artifacts import ARTIFACTS, STARTUP_TIMINGS, ensure_nltk_data, fetch_artifact, startup_stage
+from sentiment.kernel import linear_kernel
+from sentiment.lemma_cache import DEFAULT_PATH as LEMMA_CACHE_PATH, lemma_cache
+from sentiment.metrics import SentimentMetrics
+from sentiment.online import DEFAULT_TOLERANCE, ModelStore, labelled_batch
+from sentiment.predict import DEFAULT_BATCH_SIZE, load_artifacts, predict_data
+from sentiment.prediction_cache import DEFAULT_PATH as PREDICTION_CACHE_PATH, model_key, prediction_cache
+from sentiment.server import DEFAULT_HOST, DEFAULT_MAX_BATCH_SIZE, DEFAULT_MAX_WAIT_MS, DEFAULT_PORT, ScoringServer
+from sentiment.streaming import DEFAULT_CHUNKSIZE, score_chunks
+from sentiment.train import DEFAULT_HASHING_FEATURES, DEFAULT_HOLDOUT, VECTORIZER_MODES, holdout_split, train, training_data
+
+
+class PredictionWriter:
+    """Appends scored chunks to a CSV or Parquet file, chosen by extension."""
+
+    def __init__(self, path):
+        self.path = path
+        self.parquet = path.endswith('.parquet')
+        self._writer = None
+        self._file = None
+
+    def write(self, chunk):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            if self._writer is None:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            else:
+                table = pa.Table.from_pandas(chunk, schema=self._writer.schema, preserve_index=False)
+            self._writer.write_table(table)
+        else:
+            header = self._file is None
+            if header:
+                self._file = open(self.path, 'w', newline='', encoding='utf-8')
+            chunk.to_csv(self._file, header=header, index=False)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        if self._file is not None:
+            self._file.close()
+
+
+def resolve_artifacts(args):
+    """(vectorizer, model, model key) for the artifacts the arguments select."""
+    if args.online:
+        vectorizer_path, model_path = ModelStore().paths()
+    else:
+        vectorizer_path = args.vectorizer or fetch_artifact('vectorizer')
+        model_path = args.model or fetch_artifact('model')
+    vectorizer, model = load_artifacts(vectorizer_path, model_path, mmap=not args.no_mmap)
+    return vectorizer, model, model_key(vectorizer_path, model_path)
+
+
+def fetch(args):
+    for name in ARTIFACTS:
+        with startup_stage(name):
+            path = fetch_artifact(name, trust_first=args.trust_on_first_use or None)
+        print(f"{name}: {path}", file=sys.stderr)
+    ensure_nltk_data()
+    print(", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in STARTUP_TIMINGS.items()), file=sys.stderr)
+
+
+def score(args):
+    lemma_cache.load(args.lemma_cache)
+    prediction_cache.load(args.prediction_cache)
+    vectorizer, model, key = resolve_artifacts(args)
+    kernel = linear_kernel(vectorizer, model)
+
+    def predict(chunk):
+        return predict_data(chunk, vectorizer, model, workers=args.workers, batch_size=args.batch_size,
+                            kernel=kernel, cache=prediction_cache, model_key=key)
+
+    def progress(fraction, rows):
+        if not args.quiet:
+            print(f"\r{fraction:6.1%}  {rows} rows", end='', file=sys.stderr, flush=True)
+
+    start = time.perf_counter()
+    writer = PredictionWriter(args.output)
+    metrics = None
+    rows = 0
+    try:
+        for chunk in score_chunks(args.input, predict, args.chunksize, progress):
+            if 'sentiment' in chunk.columns:
+                metrics = (metrics or SentimentMetrics()).update(chunk['sentiment'], chunk['predictions'])
+            writer.write(chunk)
+            rows += len(chunk)
+    finally:
+        writer.close()
+    elapsed = time.perf_counter() - start
+    lemma_cache.save(args.lemma_cache)
+    prediction_cache.save(args.prediction_cache)
+
+    if not args.quiet:
+        print(file=sys.stderr)
+    print(f"Scored {rows} rows in {elapsed:.1f}s ({rows / elapsed if elapsed else 0:.0f} rows/s) -> {args.output}", file=sys.stderr)
+    if metrics is not None and metrics.total:
+        print(f"Accuracy on labelled rows: {metrics.accuracy:.2%} (precision {metrics.precision():.2f}, "
+              f"recall {metrics.recall():.2f}, F1 {metrics.f1():.2f})", file=sys.stderr)
+    stats = prediction_cache.stats()
+    print(f"Prediction cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.1%})", file=sys.stderr)
+
+
+def serve(args):
+    lemma_cache.load(args.lemma_cache)
+    prediction_cache.load(args.prediction_cache)
+    vectorizer, model, key = resolve_artifacts(args)
+    server = ScoringServer(vectorizer, model, args.host, args.port, args.max_batch_size, args.max_wait_ms, args.verbose,
+                           cache=prediction_cache, model_key=key)
+    print(f"Serving on http://{args.host}:{server.server_port} (POST /predict, GET /stats)", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        lemma_cache.save(args.lemma_cache)
+        prediction_cache.save(args.prediction_cache)
+        print(server.stats.snapshot(), file=sys.stderr)
+
+
+def train_model(args):
+    texts, labels = training_data(args.dataset or fetch_artifact('dataset'), args.workers)
+    start = time.perf_counter()
+    vectorizer, model, accuracy = train(texts, labels, args.vectorizer_mode, args.n_features, args.holdout, args.seed, args.refit)
+    elapsed = time.perf_counter() - start
+    os.makedirs(args.output_dir, exist_ok=True)
+    for obj, filename in ((vectorizer, ARTIFACTS['vectorizer'].filename), (model, ARTIFACTS['model'].filename)):
+        path = os.path.join(args.output_dir, filename)
+        joblib.dump(obj, path)
+        print(f"Wrote {path}", file=sys.stderr)
+    train_rows, test_rows = holdout_split(len(texts), args.holdout, args.seed)
+    trained_rows = len(texts) if args.refit else len(train_rows)
+    print(f"Trained a {args.vectorizer_mode} model on {trained_rows} of {len(texts)} reviews in {elapsed:.1f}s", file=sys.stderr)
+    if accuracy is not None:
+        refitted = ", before refitting on all reviews" if args.refit else ""
+        print(f"Holdout accuracy: {accuracy:.2%} on {len(test_rows)} held-out reviews{refitted}", file=sys.stderr)
+
+
+def print_update(result):
+    baseline = 'n/a' if result.baseline_accuracy is None else f"{result.baseline_accuracy:.2%}"
+    candidate = 'n/a' if result.candidate_accuracy is None else f"{result.candidate_accuracy:.2%}"
+    status = 'promoted' if result.promoted else 'kept unpromoted'
+    print(f"Version {result.version} {status}: trained on {result.trained_rows} rows, "
+          f"holdout accuracy {baseline} -> {candidate} on {result.holdout_rows} rows", file=sys.stderr)
+
+
+def online(args):
+    store = ModelStore()
+    if args.action == 'init':
+        texts, labels = training_data(args.dataset or fetch_artifact('dataset'), args.workers)
+        print_update(store.initialize(texts, labels, args.n_features, args.holdout, args.seed))
+    elif args.action == 'update':
+        lemma_cache.load()
+        texts, labels = labelled_batch(pd.read_csv(args.input), workers=args.workers)
+        lemma_cache.save()
+        if not len(labels):
+            print(f"No rows of {args.input} have a 0/1 sentiment label; nothing to learn from", file=sys.stderr)
+            return
+        print_update(store.update(texts, labels, args.holdout, args.tolerance, args.seed))
+    elif args.action == 'promote':
+        store.promote(args.version)
+        print(f"Promoted version {args.version}", file=sys.stderr)
+    else:
+        current = store.current()
+        for version in store.versions():
+            meta = store.metadata(version)
+            holdout = 'n/a' if meta['holdout_accuracy'] is None else f"{meta['holdout_accuracy']:.2%}"
+            marker = '*' if version == current else ' '
+            print(f"{marker} {version:4d}  parent {meta['parent'] or '-'}  trained rows {meta['trained_rows']}  holdout accuracy {holdout}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m sentiment', description="Headless sentiment scoring.")
+    parser.add_argument('--offline', action='store_true', help="never download; use only the local artifact cache")
+    parser.add_argument('--profile', action='store_true', help="print per-stage timings as JSON to stderr on exit")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    fetch_parser = subparsers.add_parser('fetch', help="download and verify every artifact and the NLTK data")
+    fetch_parser.add_argument('--trust-on-first-use', action='store_true',
+                              help="record the checksum of artifacts that have none pinned instead of refusing them")
+    fetch_parser.set_defaults(func=fetch)
+
+    score_parser = subparsers.add_parser('score', help="score a CSV with a 'review' column")
+    score_parser.add_argument('input', help="input CSV path")
+    score_parser.add_argument('output', help="output path (.parquet or .csv)")
+    score_parser.add_argument('--vectorizer', help="defaults to the cached vectorizer artifact")
+    score_parser.add_argument('--model', help="defaults to the cached model artifact")
+    score_parser.add_argument('--online', action='store_true', help="use the promoted online model instead of the artifacts")
+    score_parser.add_argument('--no-mmap', action='store_true', help="load private copies instead of memory-mapped packed artifacts")
+    score_parser.add_argument('--workers', type=int, default=1, help="lemmatization processes (0 for all cores)")
+    score_parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help="sentences per POS-tagging batch")
+    score_parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help="CSV rows read per chunk")
+    score_parser.add_argument('--lemma-cache', default=LEMMA_CACHE_PATH)
+    score_parser.add_argument('--prediction-cache', default=PREDICTION_CACHE_PATH)
+    score_parser.add_argument('--quiet', action='store_true')
+    score_parser.set_defaults(func=score)
+
+    train_parser = subparsers.add_parser('train', help="fit a vectorizer and LinearSVC on the review dataset")
+    train_parser.add_argument('output_dir', help="directory for vectorizer.joblib and svm_model.joblib")
+    train_parser.add_argument('--dataset', help="labelled review CSV; defaults to the cached dataset artifact")
+    train_parser.add_argument('--vectorizer-mode', choices=VECTORIZER_MODES, default='tfidf')
+    train_parser.add_argument('--n-features', type=int, default=DEFAULT_HASHING_FEATURES, help="hashing dimensionality")
+    train_parser.add_argument('--holdout', type=float, default=DEFAULT_HOLDOUT, help="fraction of reviews held out for accuracy")
+    train_parser.add_argument('--seed', type=int, default=0)
+    train_parser.add_argument('--no-refit', dest='refit', action='store_false', help="write the model fitted without the holdout rows instead of refitting on all reviews")
+    train_parser.add_argument('--workers', type=int, default=1, help="lemmatization processes (0 for all cores)")
+    train_parser.set_defaults(func=train_model)
+
+    online_parser = subparsers.add_parser('online', help="versioned model updated incrementally from labelled batches")
+    online_actions = online_parser.add_subparsers(dest='action', required=True)
+    init_parser = online_actions.add_parser('init', help="fit and promote the first version from the dataset")
+    init_parser.add_argument('--dataset', help="labelled review CSV; defaults to the cached dataset artifact")
+    init_parser.add_argument('--n-features', type=int, default=DEFAULT_HASHING_FEATURES, help="hashing dimensionality, fixed for every later version")
+    update_parser = online_actions.add_parser('update', help="fold a CSV with 'review' and 'sentiment' columns into the promoted model")
+    update_parser.add_argument('input', help="labelled CSV path")
+    update_parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help="holdout accuracy a candidate may lose and still be promoted")
+    for action_parser in (init_parser, update_parser):
+        action_parser.add_argument('--holdout', type=float, default=DEFAULT_HOLDOUT, help="fraction of rows held out, never trained on")
+        action_parser.add_argument('--seed', type=int, default=0)
+        action_parser.add_argument('--workers', type=int, default=1, help="lemmatization processes (0 for all cores)")
+    promote_parser = online_actions.add_parser('promote', help="promote a saved version, e.g. to roll back")
+    promote_parser.add_argument('version', type=int)
+    online_actions.add_parser('status', help="list versions; * marks the promoted one")
+    online_parser.set_defaults(func=online)
+
+    serve_parser = subparsers.add_parser('serve', help="run a local HTTP scoring service")
+    serve_parser.add_argument('--host', default=DEFAULT_HOST)
+    serve_parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument('--vectorizer', help="defaults to the cached vectorizer artifact")
+    serve_parser.add_argument('--model', help="defaults to the cached model artifact")
+    serve_parser.add_argument('--online', action='store_true', help="use the promoted online model instead of the artifacts")
+    serve_parser.add_argument('--no-mmap', action='store_true', help="load private copies instead of memory-mapped packed artifacts")
+    serve_parser.add_argument('--max-batch-size', type=int, default=DEFAULT_MAX_BATCH_SIZE, help="texts per micro-batch")
+    serve_parser.add_argument('--max-wait-ms', type=float, default=DEFAULT_MAX_WAIT_MS, help="how long a micro-batch waits to fill up")
+    serve_parser.add_argument('--lemma-cache', default=LEMMA_CACHE_PATH)
+    serve_parser.add_argument('--prediction-cache', default=PREDICTION_CACHE_PATH)
+    serve_parser.add_argument('--verbose', action='store_true', help="log every request")
+    serve_parser.set_defaults(func=serve)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.offline:
+        os.environ['SENTIMENT_OFFLINE'] = '1'
+    if getattr(args, 'workers', 1) == 0:
+        args.workers = None
+    if args.profile:
+        profiling.enable()
+    try:
+        args.func(args)
+    except (FileNotFoundError, LookupError) as exc:
+        parser.exit(1, f"{exc}\n")
+    finally:
+        if profiling.is_enabled():
+            print(profiling.timings.to_json(), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+from sentiment.persistence import atomic_write, dump_json
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ARTIFACT_DIR = os.environ.get('SENTIMENT_ARTIFACT_DIR', os.path.join('.cache', 'artifacts'))
+NLTK_DATA_DIR = os.path.join(ARTIFACT_DIR, 'nltk_data')
+MANIFEST_NAME = 'manifest.json'
+
+# ``bundled`` names a copy shipped with the repo that is used before any
+# download. A copy is only accepted if it matches the pinned ``sha256`` or, for
+# artifacts without one, a checksum a maintainer recorded in the manifest.
+# Recording the first copy seen (trust on first use) is opt-in: pass
+# trust_on_first_use=True or set SENTIMENT_TRUST_ON_FIRST_USE=1.
+Artifact = namedtuple('Artifact', ['filename', 'url', 'bundled', 'sha256'])
+
+ARTIFACTS = {
+    'dataset': Artifact('Teepublic_review.csv', 'https://drive.google.com/uc?id=16EV2Pz8pkr973dowSI7bnEGy-8Xzc2Gx', None, None),
+    'vectorizer': Artifact('vectorizer.joblib', 'https://drive.google.com/uc?id=1erkiQ_FBYJoQ3YXhe9FW70C0SnYVLPrg', 'vectorizer.joblib',
+                           'f860b81a2ab6d1dc673ef57e89a6eb58d7b1e6ae800a27b68af4846ca11e86d8'),
+    'model': Artifact('svm_model.joblib', 'https://drive.google.com/uc?id=11Xt9Mvjz2tIC5cM_fipmksTEFNFPAxRX', None, None),
+    'logo': Artifact('logo.png', 'https://drive.google.com/uc?id=17-RLfDavjYKh3xvLQKqZTYBMXyHIC-rw', 'Picture1.png',
+                     '964762ff09d6912730b8d4e7acc71713cda503ffc7b673b973831cf96319aa8c'),
+}
+
+# Both the pre-3.9 and current NLTK names; whichever the installed version
+# does not know is skipped by the downloader.
+NLTK_PACKAGES = ['punkt', 'punkt_tab', 'averaged_perceptron_tagger', 'averaged_perceptron_tagger_eng', 'wordnet', 'omw-1.4']
+
+STARTUP_TIMINGS = {}
+
+_manifest_lock = threading.Lock()
+_nltk_lock = threading.Lock()
+_nltk_ready = False
+
+
+class ArtifactUnavailable(FileNotFoundError):
+    pass
+
+
+def offline_mode():
+    return os.environ.get('SENTIMENT_OFFLINE', '').lower() in ('1', 'true', 'yes')
+
+
+def trust_on_first_use():
+    return os.environ.get('SENTIMENT_TRUST_ON_FIRST_USE', '').lower() in ('1', 'true', 'yes')
+
+
+@contextmanager
+def startup_stage(name):
+    """Record how long a cold-start step took; only cache misses run these."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STARTUP_TIMINGS[name] = time.perf_counter() - start
+
+
+def sha256sum(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _manifest_path(artifact_dir):
+    return os.path.join(artifact_dir, MANIFEST_NAME)
+
+
+def _read_manifest(artifact_dir):
+    path = _manifest_path(artifact_dir)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _record_checksum(artifact_dir, filename, checksum):
+    with _manifest_lock:
+        manifest = _read_manifest(artifact_dir)
+        manifest[filename] = checksum
+        dump_json(_manifest_path(artifact_dir), manifest, indent=2, sort_keys=True)
+
+
+def _expected_checksum(artifact, artifact_dir):
+    return artifact.sha256 or _read_manifest(artifact_dir).get(artifact.filename)
+
+
+def _accept(path, artifact, artifact_dir):
+    """True if ``path`` holds the expected artifact; records the checksum when there is none yet."""
+    expected = _expected_checksum(artifact, artifact_dir)
+    checksum = sha256sum(path)
+    if expected is None:
+        _record_checksum(artifact_dir, artifact.filename, checksum)
+        return True
+    return checksum == expected
+
+
+class _ChecksumMismatch(Exception):
+    pass
+
+
+def _install(path, artifact, artifact_dir, write):
+    """Move the file ``write(tmp_path)`` produces to ``path`` if it holds the expected artifact.
+
+    Returns False, leaving ``path`` untouched, when it does not.
+    """
+    def write_verified(tmp_path):
+        write(tmp_path)
+        if not _accept(tmp_path, artifact, artifact_dir):
+            raise _ChecksumMismatch
+    try:
+        atomic_write(path, write_verified)
+    except _ChecksumMismatch:
+        return False
+    return True
+
+
+def fetch_artifact(name, offline=None, artifact_dir=ARTIFACT_DIR, trust_first=None):
+    """Local path of a named artifact, downloading it only when no verified copy exists."""
+    artifact = ARTIFACTS[name]
+    offline = offline_mode() if offline is None else offline
+    trust_first = trust_on_first_use() if trust_first is None else trust_first
+    os.makedirs(artifact_dir, exist_ok=True)
+    if not trust_first and _expected_checksum(artifact, artifact_dir) is None:
+        raise ArtifactUnavailable(
+            f"{artifact.filename} has no pinned or recorded SHA-256; run python -m sentiment fetch --trust-on-first-use "
+            f"to download it and record its checksum in {_manifest_path(artifact_dir)}, or pin it in sentiment.artifacts.ARTIFACTS")
+    path = os.path.join(artifact_dir, artifact.filename)
+    if os.path.exists(path) and _accept(path, artifact, artifact_dir):
+        return path
+    bundled = os.path.join(REPO_DIR, artifact.bundled) if artifact.bundled else None
+    # Each copy or download goes to its own temporary file, so concurrent
+    # fetches of one artifact never write into the same file.
+    if bundled and os.path.exists(bundled) and _install(path, artifact, artifact_dir, lambda tmp_path: shutil.copyfile(bundled, tmp_path)):
+        return path
+    if offline:
+        raise ArtifactUnavailable(f"{artifact.filename} is not in {artifact_dir} and offline mode is on")
+    import gdown
+    if not _install(path, artifact, artifact_dir, lambda tmp_path: gdown.download(artifact.url, tmp_path, quiet=False)):
+        raise ArtifactUnavailable(f"checksum mismatch for downloaded {artifact.filename}")
+    return path
+
+
+def _probe_nltk():
+    from nltk import pos_tag, word_tokenize
+    from nltk.stem import WordNetLemmatizer
+    lemmatizer = WordNetLemmatizer()
+    for word, _ in pos_tag(word_tokenize("Checking the corpora")):
+        lemmatizer.lemmatize(word)
+
+
+def ensure_nltk_data(offline=None):
+    """Make the tokenizer, tagger and WordNet data available, downloading them on first use."""
+    global _nltk_ready
+    if _nltk_ready:
+        return
+    with _nltk_lock:
+        if _nltk_ready:
+            return
+        import nltk
+        data_dir = os.path.abspath(NLTK_DATA_DIR)
+        if data_dir not in nltk.data.path:
+            nltk.data.path.insert(0, data_dir)
+        try:
+            _probe_nltk()
+        except LookupError:
+            if offline_mode() if offline is None else offline:
+                raise LookupError(f"NLTK data is missing from {data_dir} and offline mode is on; run python -m sentiment fetch first")
+            with startup_stage('nltk_download'):
+                for package in NLTK_PACKAGES:
+                    nltk.download(package, download_dir=data_dir, quiet=True)
+            _probe_nltk()
+        _nltk_ready = True
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+UNKNOWN_COUNTRY = "Unknown"
+
+_country_names = None
+
+
+def country_names():
+    """Alpha-2 code -> country name for every ISO 3166 country, built once per process."""
+    global _country_names
+    if _country_names is None:
+        import pycountry
+        _country_names = {country.alpha_2: country.name for country in pycountry.countries}
+    return _country_names
+
+
+def resolve_country_names(codes):
+    """Vectorized lookup for a Series or Index of codes; unknown codes come back as NaN."""
+    return codes.str.upper().map(country_names())
+
+
+def unknown_code_counts(codes, names, weights):
+    """Total ``weights`` per code that did not resolve, largest first."""
+    unresolved = names.isna()
+    return weights[unresolved].groupby(codes[unresolved], dropna=False, observed=True).sum().sort_values(ascending=False)
+
+
+def country_name_categorical(codes):
+    """Country names for a categorical Series of codes, resolved once per category."""
+    categories = codes.cat.categories
+    category_names = resolve_country_names(categories).fillna(UNKNOWN_COUNTRY)
+    name_categories = pd.Index(category_names.unique()).union([UNKNOWN_COUNTRY])
+    lookup = name_categories.get_indexer(category_names)
+    store_codes = codes.cat.codes.to_numpy()
+    # Missing codes (-1) resolve to "Unknown", like any other unknown code.
+    row_codes = np.where(store_codes >= 0, lookup[store_codes], name_categories.get_loc(UNKNOWN_COUNTRY))
+    return pd.Series(pd.Categorical.from_codes(row_codes, categories=name_categories), index=codes.index)
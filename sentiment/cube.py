@@ -0,0 +1,76 @@
+CUBE_KEYS = ['store_location', 'date', 'month', 'period']
+# Months per trend bucket. The dataset only records year and month, so a
+# month is the finest resolution a trend can have.
+TREND_RESOLUTIONS = {'month': 1, 'quarter': 3, 'year': 12}
+MAX_TREND_POINTS = 60
+
+
+def period_key(year, month):
+    """Months since year 0 (``year * 12 + month - 1``) as an integer bucket key.
+
+    Nullable ``Int32`` when a year or month is missing, ``int32`` otherwise.
+    """
+    dtype = 'Int32' if year.isna().any() or month.isna().any() else 'int32'
+    return year.astype(dtype) * 12 + month.astype(dtype) - 1
+
+
+def build_sentiment_cube(df):
+    """Positive/negative review counts per (store_location, year, month).
+
+    The dataset keeps the review year in its ``date`` column, so the cube does
+    too; every dashboard aggregate can be answered from these cells.
+    """
+    # Rows without a year or month can never match the dashboard filters, but
+    # rows without a store_location still count towards the totals.
+    # Only the key and label columns are taken, never the review text.
+    dated = df.loc[df['date'].notna() & df['month'].notna(), [*CUBE_KEYS, 'Actual_sentiment']]
+    cube = dated.groupby(CUBE_KEYS, dropna=False, observed=True)['Actual_sentiment'].agg(total='count', positive='sum').reset_index()
+    cube['positive'] = cube['positive'].astype('int64')
+    cube['negative'] = cube['total'] - cube['positive']
+    cube['period'] = cube['period'].astype('int32')
+    # Period order lets sentiment.time_index.TimeIndex slice the cube as well.
+    return cube.sort_values('period', kind='stable', ignore_index=True)
+
+
+def filter_cube(cube, start_year, end_year, start_month, end_month):
+    mask = cube['date'].between(start_year, end_year) & cube['month'].between(start_month, end_month)
+    return cube[mask]
+
+
+def review_mask(df, start_year, end_year, start_month, end_month):
+    """Boolean array selecting the rows of ``df`` inside the period, for indexing only the columns a view needs."""
+    return (df['date'].between(start_year, end_year) & df['month'].between(start_month, end_month)).to_numpy(dtype=bool, na_value=False)
+
+
+def sentiment_by(cube, key):
+    """Negative/positive/total counts grouped by a cube column (or list of columns)."""
+    return cube.groupby(key, observed=True)[['negative', 'positive', 'total']].sum()
+
+
+def trend_resolution(cube, max_points=MAX_TREND_POINTS):
+    """Finest resolution at which the cube's periods fit in ``max_points`` buckets."""
+    for resolution, months in TREND_RESOLUTIONS.items():
+        if cube['period'].floordiv(months).nunique() <= max_points:
+            return resolution
+    return 'year'
+
+
+def sentiment_trend(cube, resolution='month'):
+    """Negative/positive counts per month, quarter or year, indexed by labels like 2021-03, 2021-Q1 or 2021.
+
+    Buckets are integer divisions of the period key; label strings are only
+    built for the (bounded) number of buckets, never per row.
+    """
+    months = TREND_RESOLUTIONS[resolution]
+    trend = cube.groupby(cube['period'] // months)[['negative', 'positive']].sum()
+    first_periods = trend.index * months
+    years, month_offsets = first_periods // 12, first_periods % 12
+    if resolution == 'month':
+        labels = [f"{year}-{offset + 1:02d}" for year, offset in zip(years, month_offsets)]
+    elif resolution == 'quarter':
+        labels = [f"{year}-Q{offset // 3 + 1}" for year, offset in zip(years, month_offsets)]
+    else:
+        labels = [str(year) for year in years]
+    trend.index = labels
+    trend.index.name = resolution
+    return trend
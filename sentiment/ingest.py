@@ -0,0 +1,238 @@
+import argparse
+import hashlib
+import os
+from functools import wraps
+
+import numpy as np
+import pandas as pd
+
+from sentiment.artifacts import sha256sum
+from sentiment.countries import country_name_categorical
+from sentiment.cube import period_key
+from sentiment.persistence import atomic_write
+from sentiment.text import COLUMN_CLEANING_PATTERN, clean_series, normalize_texts
+
+CACHE_DIR = '.cache'
+# Bumped whenever the layout of the cached frame changes; 2 sorts rows by period.
+CACHE_VERSION = 2
+TEXT_COLUMNS = ['title', 'review']
+# The year lives in the ``date`` column. Integer downcasts are skipped for
+# columns with missing values, which would otherwise need nullable dtypes.
+DATASET_DTYPES = {
+    'store_location': 'category',
+    'date': 'int16',
+    'month': 'int8',
+    'Actual_sentiment': 'int8',
+}
+
+
+def cache_path(csv_path, lemmatize=False, cache_dir=CACHE_DIR):
+    """Location of the normalized cache for the current contents of ``csv_path``."""
+    key = hashlib.sha256()
+    key.update(sha256sum(csv_path).encode())
+    # Changing the cleaning rules or the row layout must invalidate every existing cache file.
+    key.update(COLUMN_CLEANING_PATTERN.encode())
+    key.update(str(CACHE_VERSION).encode())
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    suffix = '-lemmatized' if lemmatize else ''
+    return os.path.join(cache_dir, f"{stem}-{key.hexdigest()[:16]}{suffix}.parquet")
+
+
+def sort_by_period(df):
+    """Rows ordered by (year, month), ties in file order, rows missing either last.
+
+    ``sentiment.time_index.TimeIndex`` relies on this order to answer period
+    filters with binary search instead of scanning the columns.
+    """
+    key = (df['date'] * 12 + df['month']).to_numpy(dtype=float, na_value=np.nan)
+    # NaN sorts last in numpy.
+    return df.take(np.argsort(key, kind='stable')).reset_index(drop=True)
+
+
+def normalize_frame(df, lemmatize=False, workers=1):
+    for column in TEXT_COLUMNS:
+        df[column] = clean_series(df[column])
+    if lemmatize:
+        df['review_lemmatized'] = normalize_texts(df['review'], workers=workers)
+    if 'date' in df.columns and 'month' in df.columns:
+        df = sort_by_period(df)
+    return df
+
+
+def apply_dtype_schema(df):
+    """Compact dtypes for the review dataset, plus a categorical country_name
+    and an integer ``period`` key (year * 12 + month - 1) for trends.
+
+    The memory footprint before and after is kept in ``df.attrs['memory_footprint']``.
+    """
+    before = df.memory_usage(deep=True).sum()
+    for column, dtype in DATASET_DTYPES.items():
+        if column not in df.columns:
+            continue
+        if dtype != 'category' and df[column].isna().any():
+            continue
+        df[column] = df[column].astype(dtype)
+    if 'store_location' in df.columns:
+        df['country_name'] = country_name_categorical(df['store_location'])
+    if 'date' in df.columns and 'month' in df.columns:
+        df['period'] = period_key(df['date'], df['month'])
+    df.attrs['memory_footprint'] = (int(before), int(df.memory_usage(deep=True).sum()))
+    return df
+
+
+READ_ONLY_MESSAGE = "the shared dataset is read-only; filter it into a view or take a copy() to modify it"
+# DataFrame methods that take inplace=; ReadOnlyFrame rejects inplace=True on each.
+INPLACE_METHODS = (
+    'bfill', 'clip', 'drop', 'drop_duplicates', 'dropna', 'eval', 'ffill', 'fillna', 'interpolate', 'mask',
+    'query', 'rename', 'rename_axis', 'replace', 'reset_index', 'set_index', 'sort_index', 'sort_values', 'where',
+)
+
+
+class _ReadOnlyIndexer:
+    """``loc``/``iloc``/``at``/``iat`` of a ``ReadOnlyFrame``: lookups pass through, assignments raise."""
+
+    __slots__ = ('_indexer',)
+
+    def __init__(self, indexer):
+        self._indexer = indexer
+
+    def __getitem__(self, key):
+        return self._indexer[key]
+
+    def __setitem__(self, key, value):
+        raise ValueError(READ_ONLY_MESSAGE)
+
+    def __call__(self, *args, **kwargs):
+        # df.loc(axis=...), which pandas itself uses, e.g. in dropna.
+        return _ReadOnlyIndexer(self._indexer(*args, **kwargs))
+
+
+class ReadOnlyFrame(pd.DataFrame):
+    """A DataFrame that rejects every change to itself.
+
+    Column assignment and deletion, ``loc``/``iloc``/``at``/``iat``
+    assignment, ``inplace=True`` methods and relabelling the axes raise
+    ``ValueError``. Everything derived from it (selections, filtered views,
+    ``copy()``, results of methods) is a plain DataFrame, and copy-on-write,
+    always on from pandas 3, keeps changes to those away from the shared
+    columns.
+    """
+
+    @property
+    def _constructor(self):
+        return pd.DataFrame
+
+    @property
+    def loc(self):
+        return _ReadOnlyIndexer(super().loc)
+
+    @property
+    def iloc(self):
+        return _ReadOnlyIndexer(super().iloc)
+
+    @property
+    def at(self):
+        return _ReadOnlyIndexer(super().at)
+
+    @property
+    def iat(self):
+        return _ReadOnlyIndexer(super().iat)
+
+    def __setitem__(self, key, value):
+        raise ValueError(READ_ONLY_MESSAGE)
+
+    def __delitem__(self, key):
+        raise ValueError(READ_ONLY_MESSAGE)
+
+    def insert(self, *args, **kwargs):
+        raise ValueError(READ_ONLY_MESSAGE)
+
+    def isetitem(self, *args, **kwargs):
+        raise ValueError(READ_ONLY_MESSAGE)
+
+    @property
+    def columns(self):
+        return super().columns
+
+    @columns.setter
+    def columns(self, value):
+        raise ValueError(READ_ONLY_MESSAGE)
+
+    @property
+    def index(self):
+        return super().index
+
+    @index.setter
+    def index(self, value):
+        raise ValueError(READ_ONLY_MESSAGE)
+
+
+def _reject_inplace(method):
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if kwargs.get('inplace'):
+            raise ValueError(READ_ONLY_MESSAGE)
+        return method(self, *args, **kwargs)
+    return wrapper
+
+
+for _name in INPLACE_METHODS:
+    # A method a later pandas drops is simply not wrapped.
+    if hasattr(pd.DataFrame, _name):
+        setattr(ReadOnlyFrame, _name, _reject_inplace(getattr(pd.DataFrame, _name)))
+
+
+def read_only(df):
+    """``df`` as a ``ReadOnlyFrame`` over read-only views of its own column arrays, without copying.
+
+    Meant for the frame a process shares between sessions: an in-place write
+    such as ``df.loc[...] = ...`` or ``df['new'] = ...`` raises instead of
+    leaking into every session. Numpy-backed columns are also read-only
+    arrays, so writing through ``to_numpy()`` raises as well.
+    """
+    columns = {}
+    for column in df.columns:
+        series = df[column]
+        if isinstance(series.dtype, np.dtype):
+            # A view, so the flag does not change the caller's array.
+            values = series.to_numpy().view()
+            values.setflags(write=False)
+            columns[column] = values
+        else:
+            # Extension arrays (Arrow strings, categoricals) are shared as
+            # they are; ReadOnlyFrame keeps writes from reaching them.
+            columns[column] = series.array
+    frozen = ReadOnlyFrame(columns, index=df.index, copy=False)
+    frozen.attrs.update(df.attrs)
+    return frozen
+
+
+def build_normalized_cache(csv_path, lemmatize=False, workers=1, cache_dir=CACHE_DIR):
+    path = cache_path(csv_path, lemmatize, cache_dir)
+    df = normalize_frame(pd.read_csv(csv_path, encoding="latin1"), lemmatize, workers)
+    # Two processes building the same cache each write their own temporary file.
+    atomic_write(path, lambda tmp_path: df.to_parquet(tmp_path, index=False))
+    return path
+
+
+def load_normalized(csv_path, lemmatize=False, workers=1, cache_dir=CACHE_DIR):
+    """Read the cleaned dataset, running the ingest step only if no cache matches the CSV."""
+    path = cache_path(csv_path, lemmatize, cache_dir)
+    if not os.path.exists(path):
+        build_normalized_cache(csv_path, lemmatize, workers, cache_dir)
+    return apply_dtype_schema(pd.read_parquet(path))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute the normalized review columns for a dataset CSV.")
+    parser.add_argument('csv_path')
+    parser.add_argument('--lemmatize', action='store_true', help="also store a lemmatized review column")
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    args = parser.parse_args(argv)
+    path = build_normalized_cache(args.csv_path, args.lemmatize, args.workers, args.cache_dir)
+    print(f"Wrote {path}")
+
+
+if __name__ == '__main__':
+    main()
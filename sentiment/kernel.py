@@ -0,0 +1,87 @@
+import numpy as np
+
+from sentiment.packed import SortedVocabulary
+
+
+class LinearKernel:
+    """TF-IDF vectorizer and binary linear classifier folded into one scoring function.
+
+    The coefficients are multiplied by the idf weights once, indexed by
+    vocabulary id, so a document's decision value is a sparse dot product over
+    its token ids followed by the vectorizer's row normalisation. Scoring skips
+    building a sparse matrix and sklearn's per-call input validation.
+    """
+
+    def __init__(self, vectorizer, model):
+        coef = np.asarray(model.coef_, dtype=np.float64)
+        if coef.shape[0] != 1 or len(model.classes_) != 2:
+            raise ValueError("LinearKernel only supports binary linear classifiers")
+        # Mirror TfidfTransformer.transform, which skips idf weighting when the
+        # fitted transformer has no idf_.
+        idf = getattr(vectorizer, 'idf_', None) if getattr(vectorizer, 'use_idf', False) else None
+        self.idf = np.ones(coef.shape[1]) if idf is None else np.asarray(idf, dtype=np.float64)
+        self.weights = coef[0] * self.idf
+        self.intercept = float(np.ravel(model.intercept_)[0])
+        self.classes = np.asarray(model.classes_)
+        self.vocabulary = vectorizer.vocabulary_
+        self.analyze = vectorizer.build_analyzer()
+        self.binary = vectorizer.binary
+        self.sublinear_tf = getattr(vectorizer, 'sublinear_tf', False)
+        self.norm = getattr(vectorizer, 'norm', None)
+
+    def _token_ids(self, tokens):
+        if isinstance(self.vocabulary, SortedVocabulary):
+            return self.vocabulary.lookup(tokens)
+        return np.fromiter((self.vocabulary.get(token, -1) for token in tokens), dtype=np.int64, count=len(tokens))
+
+    def decision_function(self, texts):
+        tokens = []
+        lengths = []
+        for text in texts:
+            doc_tokens = self.analyze(text)
+            tokens.extend(doc_tokens)
+            lengths.append(len(doc_tokens))
+        n_docs = len(lengths)
+        ids = self._token_ids(tokens).astype(np.int64)
+        docs = np.repeat(np.arange(n_docs, dtype=np.int64), lengths)
+        known = ids >= 0
+        docs, ids = docs[known], ids[known]
+
+        # One (document, term) pair per distinct term, with its count: the
+        # nonzeros of the CountVectorizer row.
+        n_features = len(self.weights)
+        pairs, tf = np.unique(docs * n_features + ids, return_counts=True)
+        docs, ids = pairs // n_features, pairs % n_features
+        tf = tf.astype(np.float64)
+        if self.binary:
+            tf[:] = 1.0
+        if self.sublinear_tf:
+            tf = np.log(tf) + 1.0
+
+        scores = np.bincount(docs, weights=tf * self.weights[ids], minlength=n_docs)
+        if self.norm is not None:
+            values = tf * self.idf[ids]
+            if self.norm == 'l2':
+                norms = np.sqrt(np.bincount(docs, weights=values * values, minlength=n_docs))
+            else:
+                norms = np.bincount(docs, weights=np.abs(values), minlength=n_docs)
+            # Empty rows stay all-zero under sklearn's normalize.
+            norms[norms == 0] = 1.0
+            scores = scores / norms
+        return scores + self.intercept
+
+    def predict(self, texts):
+        return self.classes[(self.decision_function(texts) > 0).astype(int)]
+
+    def predict_one(self, text):
+        return self.predict([text])[0]
+
+
+def linear_kernel(vectorizer, model):
+    """A ``LinearKernel`` for this vectorizer/model pair, or None if the model is not binary linear."""
+    if not hasattr(model, 'coef_') or not hasattr(vectorizer, 'vocabulary_'):
+        return None
+    try:
+        return LinearKernel(vectorizer, model)
+    except ValueError:
+        return None
@@ -0,0 +1,89 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from sentiment.persistence import DebouncedSave, dump_json
+
+DEFAULT_MAXSIZE = 100000
+DEFAULT_PATH = os.path.join('.cache', 'lemma_cache.json')
+# Seconds a save_later waits, collecting further requests into the same write.
+DEFAULT_SAVE_DELAY = 30
+
+
+class LemmaCache:
+    """Bounded LRU cache of lemmas keyed on (token, WordNet POS)."""
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._savers = {}
+        # Streamlit serves sessions from threads, so guard the reordering.
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def lemmatize(self, lemmatizer, word, pos):
+        key = (word, pos)
+        with self._lock:
+            lemma = self._entries.get(key)
+            if lemma is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return lemma
+            self.misses += 1
+        lemma = lemmatizer.lemmatize(word, pos)
+        with self._lock:
+            self._entries[key] = lemma
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return lemma
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def save(self, path=DEFAULT_PATH):
+        with self._lock:
+            # Least recently used first, so a reload keeps the eviction order.
+            entries = [[word, pos, lemma] for (word, pos), lemma in self._entries.items()]
+        dump_json(path, {'maxsize': self.maxsize, 'entries': entries})
+
+    def save_later(self, path=DEFAULT_PATH, delay=DEFAULT_SAVE_DELAY):
+        """Schedule ``save`` on a background thread; repeated calls within ``delay`` seconds write once."""
+        with self._lock:
+            saver = self._savers.get(path)
+            if saver is None:
+                saver = self._savers[path] = DebouncedSave(lambda: self.save(path), delay)
+        saver.request()
+
+    def load(self, path=DEFAULT_PATH):
+        if not os.path.exists(path):
+            return False
+        with open(path, encoding='utf-8') as f:
+            payload = json.load(f)
+        with self._lock:
+            for word, pos, lemma in payload['entries']:
+                self._entries[(word, pos)] = lemma
+                self._entries.move_to_end((word, pos))
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return True
+
+
+lemma_cache = LemmaCache(int(os.environ.get('LEMMA_CACHE_SIZE', DEFAULT_MAXSIZE)))
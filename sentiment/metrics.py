@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+
+LABELS = (0, 1)
+
+
+class SentimentMetrics:
+    """Confusion matrix (actual x predicted) accumulated one batch at a time.
+
+    Every metric is derived from the counts, so the labels are read once per
+    batch. Accumulators built over separate chunks or in separate processes
+    combine with ``merge`` or ``+`` into the same result as one pass over all
+    of the rows.
+    """
+
+    def __init__(self, labels=LABELS, counts=None):
+        self.labels = tuple(labels)
+        size = len(self.labels)
+        self.counts = np.zeros((size, size), dtype=np.int64) if counts is None else np.asarray(counts, dtype=np.int64)
+
+    def update(self, actual, predicted):
+        """Add a batch, skipping rows whose actual label is missing or not one of ``labels``."""
+        actual = pd.Series(actual).reset_index(drop=True)
+        predicted = pd.Series(predicted).reset_index(drop=True)
+        labels = pd.Index(self.labels)
+        actual_codes = labels.get_indexer(actual.astype(object).where(actual.notna()))
+        predicted_codes = labels.get_indexer(predicted.astype(object))
+        known = (actual_codes >= 0) & (predicted_codes >= 0)
+        size = len(self.labels)
+        self.counts += np.bincount(actual_codes[known] * size + predicted_codes[known], minlength=size * size).reshape(size, size)
+        return self
+
+    def merge(self, other):
+        if other.labels != self.labels:
+            raise ValueError(f"cannot merge metrics over labels {other.labels} into {self.labels}")
+        self.counts += other.counts
+        return self
+
+    def __add__(self, other):
+        return SentimentMetrics(self.labels, self.counts.copy()).merge(other)
+
+    @property
+    def total(self):
+        return int(self.counts.sum())
+
+    @property
+    def accuracy(self):
+        return self.counts.trace() / self.total if self.total else 0.0
+
+    def actual_counts(self):
+        return pd.Series(self.counts.sum(axis=1), index=self.labels)
+
+    def predicted_counts(self):
+        return pd.Series(self.counts.sum(axis=0), index=self.labels)
+
+    def per_label(self):
+        """precision, recall, f1-score and support per label, with 0.0 where undefined."""
+        true_positives = np.diag(self.counts).astype(float)
+        predicted = self.counts.sum(axis=0)
+        support = self.counts.sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            precision = np.where(predicted > 0, true_positives / predicted, 0.0)
+            recall = np.where(support > 0, true_positives / support, 0.0)
+            f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+        return pd.DataFrame({'precision': precision, 'recall': recall, 'f1-score': f1, 'support': support}, index=self.labels)
+
+    def precision(self, label=1):
+        return float(self.per_label().loc[label, 'precision'])
+
+    def recall(self, label=1):
+        return float(self.per_label().loc[label, 'recall'])
+
+    def f1(self, label=1):
+        return float(self.per_label().loc[label, 'f1-score'])
+
+    def classification_report(self):
+        """Same layout as ``sklearn.metrics.classification_report(..., output_dict=True)``."""
+        table = self.per_label()
+        # sklearn only reports labels that occur in either the actual or the predicted values.
+        table = table[(table['support'] > 0) | (self.counts.sum(axis=0) > 0)]
+        report = {str(label): {**row[['precision', 'recall', 'f1-score']].astype(float).to_dict(), 'support': int(row['support'])}
+                  for label, row in table.iterrows()}
+        report['accuracy'] = float(self.accuracy)
+        scores = table[['precision', 'recall', 'f1-score']]
+        support = table['support']
+        report['macro avg'] = {**scores.mean().astype(float).to_dict(), 'support': int(support.sum())}
+        weights = support / support.sum() if support.sum() else support * 0.0
+        report['weighted avg'] = {**scores.mul(weights, axis=0).sum().astype(float).to_dict(), 'support': int(support.sum())}
+        return report
@@ -0,0 +1,187 @@
+import copy
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+import joblib
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: only sessions within one process are serialized
+    fcntl = None
+
+from sentiment.artifacts import ARTIFACT_DIR
+from sentiment.persistence import atomic_write, dump_json
+from sentiment.text import normalize_texts
+from sentiment.train import DEFAULT_HASHING_FEATURES, DEFAULT_HOLDOUT, holdout_split, make_vectorizer
+
+ONLINE_DIR = os.path.join(ARTIFACT_DIR, 'online')
+CLASSES = np.array([0, 1])
+# A candidate may lose at most this much holdout accuracy and still be promoted.
+DEFAULT_TOLERANCE = 0.0
+
+# Serializes stores within this process; the lock file covers other processes.
+_store_lock = threading.Lock()
+
+UpdateResult = namedtuple('UpdateResult', ['version', 'promoted', 'baseline_accuracy', 'candidate_accuracy', 'trained_rows', 'holdout_rows'])
+
+
+def make_online_model(seed=0):
+    """Hinge-loss SGD: a linear SVM that can keep learning through ``partial_fit``."""
+    from sklearn.linear_model import SGDClassifier
+    return SGDClassifier(loss='hinge', alpha=1e-5, random_state=seed)
+
+
+def accuracy(vectorizer, model, texts, labels):
+    if not len(texts):
+        return None
+    return float((model.predict(vectorizer.transform(texts)) == labels).mean())
+
+
+class ModelStore:
+    """Numbered model versions on disk plus a pointer to the promoted one.
+
+    Every version keeps its vectorizer, model and metadata, so a bad update
+    can be rolled back by promoting an older version. The holdout set is the
+    labelled rows never trained on; each update evaluates against it and
+    then adds its own held-out rows, skipping texts it already holds.
+
+    Every change to the store holds a lock on its directory. ``update`` and
+    ``initialize`` hold it from reading the promoted version until the new
+    one is promoted. Concurrent sessions and processes therefore take turns:
+    each update starts from the version the previous one promoted, and none
+    loses a version number or holdout rows.
+    """
+
+    def __init__(self, directory=ONLINE_DIR):
+        self.directory = directory
+
+    def _path(self, *parts):
+        return os.path.join(self.directory, *parts)
+
+    @contextmanager
+    def _locked(self):
+        os.makedirs(self.directory, exist_ok=True)
+        with _store_lock, open(self._path('.lock'), 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+    def versions(self):
+        if not os.path.isdir(self._path('versions')):
+            return []
+        return sorted(int(name) for name in os.listdir(self._path('versions')) if name.isdigit())
+
+    def current(self):
+        """The promoted version number, or None before ``initialize``."""
+        path = self._path('current.json')
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)['version']
+
+    def metadata(self, version):
+        with open(self._path('versions', f"{version:04d}", 'meta.json'), encoding='utf-8') as f:
+            return json.load(f)
+
+    def paths(self, version=None):
+        """(vectorizer path, model path) of ``version``, the promoted one by default."""
+        version = self.current() if version is None else version
+        if version is None:
+            raise FileNotFoundError(f"no promoted model in {self.directory}; run python -m sentiment online init first")
+        version_dir = self._path('versions', f"{version:04d}")
+        return os.path.join(version_dir, 'vectorizer.joblib'), os.path.join(version_dir, 'model.joblib')
+
+    def load(self, version=None):
+        vectorizer_path, model_path = self.paths(version)
+        return joblib.load(vectorizer_path), joblib.load(model_path)
+
+    def save(self, vectorizer, model, **meta):
+        with self._locked():
+            return self._save(vectorizer, model, **meta)
+
+    def _save(self, vectorizer, model, **meta):
+        # The _-prefixed writers expect the caller to hold _locked().
+        version = max(self.versions(), default=0) + 1
+        version_dir = self._path('versions', f"{version:04d}")
+        os.makedirs(version_dir)
+        joblib.dump(vectorizer, os.path.join(version_dir, 'vectorizer.joblib'))
+        joblib.dump(model, os.path.join(version_dir, 'model.joblib'))
+        dump_json(os.path.join(version_dir, 'meta.json'), dict(meta, version=version, created=time.time()), indent=2)
+        return version
+
+    def promote(self, version):
+        with self._locked():
+            self._promote(version)
+
+    def _promote(self, version):
+        if version not in self.versions():
+            raise FileNotFoundError(f"no version {version} in {self.directory}")
+        dump_json(self._path('current.json'), {'version': version}, indent=2)
+
+    def holdout(self):
+        path = self._path('holdout.parquet')
+        if not os.path.exists(path):
+            return pd.DataFrame({'text': pd.Series(dtype=object), 'label': pd.Series(dtype='int64')})
+        return pd.read_parquet(path)
+
+    def add_holdout(self, texts, labels):
+        """Append labelled rows to the holdout set, keeping the first row for each text."""
+        with self._locked():
+            return self._add_holdout(texts, labels)
+
+    def _add_holdout(self, texts, labels):
+        frame = pd.concat([self.holdout(), pd.DataFrame({'text': texts, 'label': labels})], ignore_index=True)
+        frame = frame.drop_duplicates('text', ignore_index=True)
+        atomic_write(self._path('holdout.parquet'), lambda tmp_path: frame.to_parquet(tmp_path, index=False))
+        return frame
+
+    def initialize(self, texts, labels, n_features=DEFAULT_HASHING_FEATURES, holdout=DEFAULT_HOLDOUT, seed=0):
+        """Fit and promote version 1 from a labelled corpus; returns its UpdateResult."""
+        train_rows, test_rows = holdout_split(len(texts), holdout, seed)
+        # Hashing keeps the feature space fixed, so later batches can extend it.
+        vectorizer = make_vectorizer('hashing', n_features)
+        model = make_online_model(seed).fit(vectorizer.transform(texts[train_rows]), labels[train_rows])
+        with self._locked():
+            frame = self._add_holdout(texts[test_rows], labels[test_rows])
+            candidate_accuracy = accuracy(vectorizer, model, frame['text'].to_numpy(dtype=object), frame['label'].to_numpy())
+            version = self._save(vectorizer, model, parent=None, trained_rows=len(train_rows), holdout_accuracy=candidate_accuracy)
+            self._promote(version)
+        return UpdateResult(version, True, None, candidate_accuracy, len(train_rows), len(frame))
+
+    def update(self, texts, labels, holdout=DEFAULT_HOLDOUT, tolerance=DEFAULT_TOLERANCE, seed=0):
+        """Fold a labelled batch into the promoted model with ``partial_fit``.
+
+        Part of the batch is held out first. The candidate is saved as a new
+        version either way, but only promoted if its accuracy on the holdout
+        set is no more than ``tolerance`` below the promoted model's.
+        """
+        train_rows, test_rows = holdout_split(len(texts), holdout, seed)
+        with self._locked():
+            parent = self.current()
+            vectorizer, model = self.load(parent)
+            candidate = copy.deepcopy(model)
+            if len(train_rows):
+                candidate.partial_fit(vectorizer.transform(texts[train_rows]), labels[train_rows], classes=CLASSES)
+
+            frame = self._add_holdout(texts[test_rows], labels[test_rows])
+            holdout_texts, holdout_labels = frame['text'].to_numpy(dtype=object), frame['label'].to_numpy()
+            baseline_accuracy = accuracy(vectorizer, model, holdout_texts, holdout_labels)
+            candidate_accuracy = accuracy(vectorizer, candidate, holdout_texts, holdout_labels)
+            promoted = baseline_accuracy is None or candidate_accuracy >= baseline_accuracy - tolerance
+            version = self._save(vectorizer, candidate, parent=parent, trained_rows=len(train_rows), holdout_accuracy=candidate_accuracy)
+            if promoted:
+                self._promote(version)
+        return UpdateResult(version, promoted, baseline_accuracy, candidate_accuracy, len(train_rows), len(frame))
+
+
+def labelled_batch(data, text_column='review', label_column='sentiment', workers=1):
+    """Normalized texts and labels for the rows of ``data`` that carry a 0/1 label."""
+    rows = data[data[label_column].isin(CLASSES)]
+    texts = normalize_texts(rows[text_column], workers=workers)
+    return np.asarray(texts, dtype=object), rows[label_column].to_numpy(dtype=np.int64)
@@ -0,0 +1,105 @@
+import copy
+import os
+from collections.abc import Mapping
+
+import joblib
+import numpy as np
+
+from sentiment.artifacts import ARTIFACT_DIR, sha256sum
+
+PACKED_DIR = os.path.join(ARTIFACT_DIR, 'packed')
+# Bumped whenever the packed layout changes, so existing packed copies are rebuilt.
+PACK_VERSION = 3
+
+
+class SortedVocabulary(Mapping):
+    """Read-only term -> feature index mapping stored as two numpy arrays.
+
+    Terms are kept as a sorted fixed-width bytes array and looked up by binary
+    search, so the whole vocabulary is two flat buffers that ``joblib.load``
+    can memory-map instead of a dict of Python strings rebuilt per process.
+    """
+
+    def __init__(self, terms, indices):
+        self.terms = terms
+        self.indices = indices
+
+    @classmethod
+    def from_dict(cls, vocabulary):
+        encoded = np.array([term.encode() for term in vocabulary])
+        order = np.argsort(encoded, kind='stable')
+        indices = np.fromiter(vocabulary.values(), dtype=np.int32, count=len(vocabulary))
+        return cls(encoded[order], indices[order])
+
+    def __getitem__(self, term):
+        key = term.encode()
+        position = self.terms.searchsorted(key)
+        if position < len(self.terms) and self.terms[position] == key:
+            return int(self.indices[position])
+        raise KeyError(term)
+
+    def __len__(self):
+        return len(self.terms)
+
+    def __iter__(self):
+        return (term.decode() for term in self.terms)
+
+    def lookup(self, terms):
+        """Feature indices for a sequence of terms, -1 where a term is unknown."""
+        if not len(terms):
+            return np.empty(0, dtype=self.indices.dtype)
+        # Keys keep their own width: truncating to the vocabulary's would let a
+        # long unknown term match its known prefix.
+        keys = np.array([term.encode() for term in terms])
+        positions = np.minimum(self.terms.searchsorted(keys), len(self.terms) - 1)
+        found = self.terms[positions] == keys
+        return np.where(found, self.indices[positions], -1)
+
+
+def pack_vectorizer(vectorizer):
+    """Copy of a fitted vectorizer whose vocabulary is a ``SortedVocabulary``.
+
+    Plain ``CountVectorizer``/``TfidfVectorizer`` copies also switch to a
+    subclass that batches vocabulary lookups in ``transform``; other
+    vectorizer classes keep their own and look terms up one at a time.
+    """
+    if not hasattr(vectorizer, 'vocabulary_'):
+        # A hashing vectorizer has no vocabulary to pack.
+        return vectorizer
+    # Imported here so the vocabulary itself stays importable without sklearn.
+    from sentiment.packed_vectorizers import PACKED_CLASSES
+    packed = copy.copy(vectorizer)
+    packed.__class__ = PACKED_CLASSES.get(type(vectorizer), type(vectorizer))
+    packed.vocabulary_ = SortedVocabulary.from_dict(vectorizer.vocabulary_)
+    # Only kept for introspection and can be larger than the vocabulary itself.
+    packed.__dict__.pop('stop_words_', None)
+    return packed
+
+
+def packed_path(source_path, packed_dir=PACKED_DIR):
+    """Where the packed copy of ``source_path`` lives; keyed by content so a new artifact repacks."""
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    return os.path.join(packed_dir, f"{stem}.{sha256sum(source_path)[:16]}.v{PACK_VERSION}.joblib")
+
+
+def load_packed(source_path, pack=None, packed_dir=PACKED_DIR):
+    """Load ``source_path`` with its numpy arrays memory-mapped read-only.
+
+    The first call writes an uncompressed copy (after applying ``pack``) next
+    to the artifact cache; every process that loads it afterwards maps the same
+    file, so the pages holding coefficients and vocabulary are shared.
+    """
+    path = packed_path(source_path, packed_dir)
+    if not os.path.exists(path):
+        os.makedirs(packed_dir, exist_ok=True)
+        obj = joblib.load(source_path)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        joblib.dump(pack(obj) if pack else obj, tmp_path)
+        os.replace(tmp_path, path)
+    return joblib.load(path, mmap_mode='r')
+
+
+def load_packed_artifacts(vectorizer_path, model_path, packed_dir=PACKED_DIR):
+    vectorizer = load_packed(vectorizer_path, pack_vectorizer, packed_dir)
+    model = load_packed(model_path, packed_dir=packed_dir)
+    return vectorizer, model
@@ -0,0 +1,56 @@
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+
+try:
+    from sklearn.utils._sparse import _align_api_if_sparse
+except ImportError:  # scikit-learn < 1.8 always returns csr_matrix
+    _align_api_if_sparse = sp.csr_matrix
+
+from sentiment.packed import SortedVocabulary
+
+
+class _BatchedVocabularyCounts:
+    """Counts documents against a ``SortedVocabulary`` with one lookup per batch.
+
+    sklearn's ``_count_vocab`` indexes the vocabulary once per token, which
+    for a ``SortedVocabulary`` means a binary search and a numpy scalar per
+    token. Here each distinct token of the batch is looked up once through
+    ``SortedVocabulary.lookup`` and the counts are assembled with numpy,
+    giving the same matrix as the dict-backed vectorizer.
+    """
+
+    def _count_vocab(self, raw_documents, fixed_vocab):
+        vocabulary = getattr(self, 'vocabulary_', None)
+        if not fixed_vocab or not isinstance(vocabulary, SortedVocabulary):
+            return super()._count_vocab(raw_documents, fixed_vocab)
+        analyze = self.build_analyzer()
+        distinct = {}
+        token_ids = []
+        lengths = []
+        for doc in raw_documents:
+            doc_tokens = analyze(doc)
+            token_ids.extend([distinct.setdefault(token, len(distinct)) for token in doc_tokens])
+            lengths.append(len(doc_tokens))
+        features = vocabulary.lookup(list(distinct))[np.asarray(token_ids, dtype=np.intp)]
+        docs = np.repeat(np.arange(len(lengths), dtype=np.int32), lengths)
+        known = features >= 0
+        values = np.ones(int(known.sum()), dtype=self.dtype)
+        X = sp.csr_array(
+            (values, (docs[known], features[known].astype(np.int32))),
+            shape=(len(lengths), len(vocabulary)),
+            dtype=self.dtype,
+        )
+        X.sum_duplicates()
+        return vocabulary, _align_api_if_sparse(X)
+
+
+class PackedCountVectorizer(_BatchedVocabularyCounts, CountVectorizer):
+    pass
+
+
+class PackedTfidfVectorizer(_BatchedVocabularyCounts, TfidfVectorizer):
+    pass
+
+
+PACKED_CLASSES = {CountVectorizer: PackedCountVectorizer, TfidfVectorizer: PackedTfidfVectorizer}
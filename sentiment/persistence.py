@@ -0,0 +1,67 @@
+import atexit
+import json
+import os
+import tempfile
+import threading
+
+
+def atomic_write(path, write):
+    """Call ``write(tmp_path)`` on a uniquely named file next to ``path``, then move it into place.
+
+    Concurrent writers each get their own temporary file, so the last one
+    to finish wins and readers never see a partial file.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory or '.', prefix=os.path.basename(path) + '.', suffix='.tmp')
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def dump_json(path, payload, **kwargs):
+    def write(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, **kwargs)
+    atomic_write(path, write)
+
+
+class DebouncedSave:
+    """Runs ``save`` on a background thread ``delay`` seconds after it is first requested.
+
+    Requests made while a save is pending fold into it, so a burst of
+    requests costs one write, and none of them waits for the write. A
+    pending save is flushed when the interpreter exits.
+    """
+
+    def __init__(self, save, delay):
+        self.save = save
+        self.delay = delay
+        self._timer = None
+        self._lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def request(self):
+        with self._lock:
+            if self._timer is None:
+                self._timer = threading.Timer(self.delay, self._run)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _run(self):
+        with self._lock:
+            self._timer = None
+        self.save()
+
+    def flush(self):
+        """Run a pending save now, on the calling thread."""
+        with self._lock:
+            timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+            self.save()
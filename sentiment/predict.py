@@ -0,0 +1,60 @@
+import joblib
+import numpy as np
+import pandas as pd
+
+from sentiment.profiling import stage
+from sentiment.text import clean_series, normalize_texts
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def load_artifacts(vectorizer_path, model_path, mmap=False):
+    """Load the vectorizer and model; ``mmap`` shares their arrays between processes via ``sentiment.packed``."""
+    if mmap:
+        from sentiment.packed import load_packed_artifacts
+        return load_packed_artifacts(vectorizer_path, model_path)
+    vectorizer = joblib.load(vectorizer_path)
+    model = joblib.load(model_path)
+    return vectorizer, model
+
+
+def _score(texts, vectorizer, model, workers, batch_size, kernel):
+    with stage('normalize', len(texts)):
+        text_data = pd.Series(normalize_texts(texts, batch_size=batch_size, workers=workers))
+    if kernel is not None:
+        with stage('kernel', len(texts)):
+            return kernel.predict(text_data)
+    with stage('vectorize', len(texts)):
+        text_features = vectorizer.transform(text_data)
+    with stage('classify', len(texts)):
+        return model.predict(text_features)
+
+
+def predict_data(input_data, vectorizer, model, workers=1, batch_size=DEFAULT_BATCH_SIZE, kernel=None, cache=None, model_key=None):
+    """Predicted labels for a DataFrame's ``review`` column or a single text.
+
+    Each distinct cleaned review is lemmatized and scored once and its label
+    scattered back to every duplicate row. With a ``PredictionCache`` and the
+    ``model_key`` of this vectorizer/model pair, reviews scored before skip
+    that work entirely. A ``sentiment.kernel.LinearKernel`` replaces
+    transform + predict when given.
+    """
+    reviews = input_data['review'] if isinstance(input_data, pd.DataFrame) else pd.Series([input_data])
+    with stage('clean', len(reviews)):
+        codes, uniques = pd.factorize(clean_series(reviews))
+    unique_texts = list(uniques)
+    if not unique_texts:
+        return np.empty(0, dtype=np.int64)
+    if cache is None or model_key is None:
+        return _score(unique_texts, vectorizer, model, workers, batch_size, kernel)[codes]
+
+    with stage('cache_lookup', len(unique_texts)):
+        keys = [cache.key(model_key, text) for text in unique_texts]
+        labels = cache.get_many(keys)
+    missing = [position for position, label in enumerate(labels) if label is None]
+    if missing:
+        scored = _score([unique_texts[position] for position in missing], vectorizer, model, workers, batch_size, kernel)
+        cache.put_many([keys[position] for position in missing], scored)
+        for position, label in zip(missing, scored):
+            labels[position] = label
+    return np.array(labels, dtype=np.int64)[codes]
@@ -0,0 +1,109 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from sentiment.artifacts import sha256sum
+from sentiment.persistence import DebouncedSave, dump_json
+
+DEFAULT_MAXSIZE = 500000
+DEFAULT_PATH = os.path.join('.cache', 'prediction_cache.json')
+# Seconds a save_later waits, collecting further requests into the same write.
+DEFAULT_SAVE_DELAY = 30
+
+
+def model_key(vectorizer_path, model_path):
+    """Identifies a vectorizer/model pair by content, so retrained artifacts never reuse old labels."""
+    return hashlib.sha256(f"{sha256sum(vectorizer_path)}:{sha256sum(model_path)}".encode()).hexdigest()[:16]
+
+
+class PredictionCache:
+    """Bounded LRU cache of predicted labels keyed on a digest of (model key, cleaned text).
+
+    Entries for a model that is no longer used are never hit again and age
+    out like any other least recently used entry.
+    """
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._savers = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def key(model_key, text):
+        return hashlib.blake2b(f"{model_key}\0{text}".encode(), digest_size=16).hexdigest()
+
+    def get_many(self, keys):
+        """Cached label per key, None where the key is missing."""
+        labels = []
+        with self._lock:
+            for key in keys:
+                label = self._entries.get(key)
+                if label is None:
+                    self.misses += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                labels.append(label)
+        return labels
+
+    def put_many(self, keys, labels):
+        with self._lock:
+            for key, label in zip(keys, labels):
+                self._entries[key] = int(label)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def save(self, path=DEFAULT_PATH):
+        with self._lock:
+            # Least recently used first, so a reload keeps the eviction order.
+            entries = list(self._entries.items())
+        dump_json(path, {'maxsize': self.maxsize, 'entries': entries})
+
+    def save_later(self, path=DEFAULT_PATH, delay=DEFAULT_SAVE_DELAY):
+        """Schedule ``save`` on a background thread; repeated calls within ``delay`` seconds write once."""
+        with self._lock:
+            saver = self._savers.get(path)
+            if saver is None:
+                saver = self._savers[path] = DebouncedSave(lambda: self.save(path), delay)
+        saver.request()
+
+    def load(self, path=DEFAULT_PATH):
+        if not os.path.exists(path):
+            return False
+        with open(path, encoding='utf-8') as f:
+            payload = json.load(f)
+        with self._lock:
+            for key, label in payload['entries']:
+                self._entries[key] = label
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return True
+
+
+prediction_cache = PredictionCache(int(os.environ.get('PREDICTION_CACHE_SIZE', DEFAULT_MAXSIZE)))
@@ -0,0 +1,118 @@
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+from functools import wraps
+
+_enabled = os.environ.get('SENTIMENT_PROFILE', '').lower() in ('1', 'true', 'yes')
+# Returned by every disabled ``stage`` call, so turning profiling off costs a
+# flag check per stage and no allocation.
+_NOOP = nullcontext()
+
+
+def is_enabled():
+    return _enabled
+
+
+def enable(flag=True):
+    global _enabled
+    _enabled = flag
+
+
+class StageTimings:
+    """Calls, durations and row counts per named stage, aggregated since the last reset."""
+
+    def __init__(self):
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds, rows=None):
+        with self._lock:
+            entry = self._stages.get(name)
+            if entry is None:
+                entry = self._stages[name] = {'calls': 0, 'seconds': 0.0, 'last_seconds': 0.0, 'max_seconds': 0.0, 'rows': 0}
+            entry['calls'] += 1
+            entry['seconds'] += seconds
+            entry['last_seconds'] = seconds
+            entry['max_seconds'] = max(entry['max_seconds'], seconds)
+            if rows is not None:
+                entry['rows'] += rows
+
+    def snapshot(self):
+        with self._lock:
+            return {name: dict(entry) for name, entry in self._stages.items()}
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2, sort_keys=True)
+
+    def to_prometheus(self, prefix='sentiment_stage'):
+        """Prometheus text exposition format, one series per stage."""
+        snapshot = self.snapshot()
+        metrics = [
+            ('calls_total', 'counter', 'Times the stage ran.', 'calls'),
+            ('seconds_total', 'counter', 'Total seconds spent in the stage.', 'seconds'),
+            ('rows_total', 'counter', 'Rows processed by the stage.', 'rows'),
+            ('last_seconds', 'gauge', 'Duration of the most recent run.', 'last_seconds'),
+            ('max_seconds', 'gauge', 'Longest run since the last reset.', 'max_seconds'),
+        ]
+        lines = []
+        for suffix, kind, help_text, field in metrics:
+            lines.append(f"# HELP {prefix}_{suffix} {help_text}")
+            lines.append(f"# TYPE {prefix}_{suffix} {kind}")
+            for name in sorted(snapshot):
+                escaped = name.replace('\\', '\\\\').replace('"', '\\"')
+                lines.append(f'{prefix}_{suffix}{{stage="{escaped}"}} {snapshot[name][field]}')
+        return '\n'.join(lines) + '\n'
+
+
+timings = StageTimings()
+
+
+class _Stage:
+    __slots__ = ('name', 'rows', 'start')
+
+    def __init__(self, name, rows):
+        self.name = name
+        self.rows = rows
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        timings.record(self.name, time.perf_counter() - self.start, self.rows)
+        return False
+
+
+def stage(name, rows=None):
+    """Context manager recording how long a block took and how many rows it handled."""
+    if not _enabled:
+        return _NOOP
+    return _Stage(name, rows)
+
+
+def timed(name=None, rows=None):
+    """Decorator recording every call of the function as a stage (named after it by default).
+
+    ``rows``, if given, is called with the same arguments once the function
+    returns and gives the row count to record for the call.
+    """
+    def decorator(func):
+        stage_name = name or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Stage(stage_name, None) as current:
+                result = func(*args, **kwargs)
+                if rows is not None:
+                    current.rows = rows(*args, **kwargs)
+                return result
+        return wrapper
+    return decorator
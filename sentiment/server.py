@@ -0,0 +1,212 @@
+import json
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from sentiment.kernel import linear_kernel
+from sentiment.predict import predict_data
+from sentiment.streaming import SENTIMENT_LABELS
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_MAX_WAIT_MS = 5.0
+
+
+class LatencyStats:
+    """Request latencies over a sliding window plus lifetime throughput counters."""
+
+    def __init__(self, window=10000):
+        self.started = time.monotonic()
+        self.requests = 0
+        self.texts = 0
+        self.batches = 0
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record_request(self, latency, texts):
+        with self._lock:
+            self.requests += 1
+            self.texts += texts
+            self._latencies.append(latency)
+
+    def record_batch(self):
+        with self._lock:
+            self.batches += 1
+
+    def snapshot(self):
+        with self._lock:
+            latencies = np.array(self._latencies)
+            requests, texts, batches = self.requests, self.texts, self.batches
+        uptime = time.monotonic() - self.started
+        p50, p99 = np.percentile(latencies, [50, 99]) * 1000 if len(latencies) else (0.0, 0.0)
+        return {
+            'requests': requests,
+            'texts': texts,
+            'batches': batches,
+            'mean_batch_size': texts / batches if batches else 0.0,
+            'latency_p50_ms': float(p50),
+            'latency_p99_ms': float(p99),
+            'throughput_rps': requests / uptime if uptime else 0.0,
+            'uptime_s': uptime,
+        }
+
+
+class MicroBatcher:
+    """Groups concurrently submitted texts into one predict call.
+
+    A batch is closed once it holds ``max_batch_size`` texts or ``max_wait``
+    seconds have passed since its first request arrived.
+    """
+
+    def __init__(self, predict_batch, max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_wait=DEFAULT_MAX_WAIT_MS / 1000, stats=None):
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.stats = stats
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, texts):
+        future = Future()
+        self._queue.put((list(texts), future))
+        return future
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _collect(self, first):
+        pending = [first]
+        count = len(first[0])
+        deadline = time.monotonic() + self.max_wait
+        while count < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if item is None:
+                # Let the main loop see the shutdown after this batch.
+                self._queue.put(None)
+                break
+            pending.append(item)
+            count += len(item[0])
+        return pending
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            pending = self._collect(first)
+            texts = [text for request_texts, _ in pending for text in request_texts]
+            try:
+                predictions = self.predict_batch(texts)
+            except Exception as exc:
+                self._rescore(pending, exc)
+                continue
+            if self.stats is not None:
+                self.stats.record_batch()
+            offset = 0
+            for request_texts, future in pending:
+                future.set_result(predictions[offset:offset + len(request_texts)])
+                offset += len(request_texts)
+
+    def _rescore(self, pending, exc):
+        """Score each request of a failed batch on its own, so one bad request only fails itself."""
+        if len(pending) == 1:
+            pending[0][1].set_exception(exc)
+            return
+        for request_texts, future in pending:
+            try:
+                predictions = self.predict_batch(request_texts)
+            except Exception as request_exc:
+                future.set_exception(request_exc)
+                continue
+            if self.stats is not None:
+                self.stats.record_batch()
+            future.set_result(predictions)
+
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send_json(200, {'status': 'ok'})
+        elif self.path == '/stats':
+            snapshot = self.server.stats.snapshot()
+            if self.server.cache is not None:
+                snapshot['prediction_cache'] = self.server.cache.stats()
+            self._send_json(200, snapshot)
+        else:
+            self._send_json(404, {'error': 'not found'})
+
+    def do_POST(self):
+        if self.path != '/predict':
+            self._send_json(404, {'error': 'not found'})
+            return
+        start = time.perf_counter()
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            texts = payload['texts'] if 'texts' in payload else [payload['text']]
+            if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+                raise TypeError
+        except (ValueError, KeyError, TypeError):
+            self._send_json(400, {'error': "expected JSON with 'text' (string) or 'texts' (list of strings)"})
+            return
+        try:
+            predictions = [int(p) for p in self.server.batcher.submit(texts).result()]
+        except Exception as exc:
+            self._send_json(500, {'error': f"{type(exc).__name__}: {exc}"})
+            return
+        self.server.stats.record_request(time.perf_counter() - start, len(texts))
+        self._send_json(200, {
+            'predictions': predictions,
+            'labels': [SENTIMENT_LABELS[p] for p in predictions],
+        })
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class ScoringServer(ThreadingHTTPServer):
+    """HTTP scoring service keeping the vectorizer and model resident in memory."""
+
+    daemon_threads = True
+    # Concurrent clients are the point of micro-batching; the default backlog of 5 resets them.
+    request_queue_size = 128
+
+    def __init__(self, vectorizer, model, host=DEFAULT_HOST, port=DEFAULT_PORT,
+                 max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_wait_ms=DEFAULT_MAX_WAIT_MS, verbose=False, cache=None, model_key=None):
+        super().__init__((host, port), ScoringHandler)
+        self.verbose = verbose
+        self.stats = LatencyStats()
+        self.cache = cache
+        kernel = linear_kernel(vectorizer, model)
+
+        def predict_batch(texts):
+            return predict_data(pd.DataFrame({'review': texts}), vectorizer, model, kernel=kernel, cache=cache, model_key=model_key)
+
+        self.batcher = MicroBatcher(predict_batch, max_batch_size, max_wait_ms / 1000, self.stats)
+
+    def server_close(self):
+        super().server_close()
+        self.batcher.close()
@@ -0,0 +1,65 @@
+import os
+
+import pandas as pd
+
+from sentiment.metrics import SentimentMetrics
+from sentiment.text import clean_series
+
+DEFAULT_CHUNKSIZE = 50000
+SENTIMENT_LABELS = {1: 'Positive Sentiment', 0: 'Negative Sentiment'}
+
+
+def _source_size(handle):
+    size = getattr(handle, 'size', None)
+    if size is not None:
+        return size
+    position = handle.tell()
+    handle.seek(0, os.SEEK_END)
+    size = handle.tell()
+    handle.seek(position)
+    return size
+
+
+def score_chunks(source, predict, chunksize=DEFAULT_CHUNKSIZE, progress=None):
+    """Yield scored chunks of a CSV with review, sentiment (if present), predictions and Sentiment_label.
+
+    ``source`` is a path or a binary file object, ``predict`` maps a chunk
+    DataFrame to an array of 0/1 predictions and ``progress`` is called with
+    (fraction of input read, rows scored) after every chunk.
+    """
+    handle = open(source, 'rb') if isinstance(source, (str, os.PathLike)) else source
+    try:
+        total_size = _source_size(handle)
+        rows = 0
+        for chunk in pd.read_csv(handle, chunksize=chunksize):
+            chunk['review'] = clean_series(chunk['review'])
+            chunk['predictions'] = predict(chunk)
+            chunk['Sentiment_label'] = chunk['predictions'].map(SENTIMENT_LABELS)
+            columns = ['review', 'predictions', 'Sentiment_label']
+            if 'sentiment' in chunk.columns:
+                # Nullable ints keep the dtype stable when a chunk has missing labels.
+                chunk['sentiment'] = chunk['sentiment'].astype('Int64')
+                columns.insert(1, 'sentiment')
+            rows += len(chunk)
+            yield chunk[columns]
+            if progress is not None:
+                progress(min(handle.tell() / total_size, 1.0) if total_size else 1.0, rows)
+    finally:
+        if handle is not source:
+            handle.close()
+
+
+def stream_predictions(source, predict, output, chunksize=DEFAULT_CHUNKSIZE, progress=None):
+    """Score a CSV chunk by chunk, appending the predictions to ``output`` as CSV.
+
+    Returns the rows scored and a ``SentimentMetrics`` over the labelled rows,
+    or None for the metrics when the file has no ``sentiment`` column.
+    """
+    metrics = None
+    rows = 0
+    for i, chunk in enumerate(score_chunks(source, predict, chunksize, progress)):
+        if 'sentiment' in chunk.columns:
+            metrics = (metrics or SentimentMetrics()).update(chunk['sentiment'], chunk['predictions'])
+        chunk.to_csv(output, header=(i == 0), index=False)
+        rows += len(chunk)
+    return rows, metrics
@@ -0,0 +1,100 @@
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from sentiment.artifacts import ensure_nltk_data
+from sentiment.lemma_cache import lemma_cache
+
+CLEANING_PATTERN = r'[^\w\s\']|_|\d|[^\x00-\x7F]+'
+CLEANING_REGEX = re.compile(CLEANING_PATTERN)
+# The same character set as CLEANING_PATTERN spelled out in ASCII, so that
+# Arrow-backed string columns can run it in RE2 without falling back to
+# per-row Python calls (RE2's \s and \w differ from Python's).
+COLUMN_CLEANING_PATTERN = r"[^A-Za-z\t\n\x0b\x0c\r\x1c-\x1f ']+"
+
+# nltk.corpus.wordnet's POS constants. Spelled out so that mapping a tag
+# neither imports nltk nor forces the WordNet corpus to load.
+WORDNET_ADJ, WORDNET_VERB, WORDNET_NOUN, WORDNET_ADV = 'a', 'v', 'n', 'r'
+
+# One lemmatizer per process; WordNetLemmatizer is stateless apart from the
+# lazily loaded corpus, so there is no reason to build one per row.
+_lemmatizer = None
+
+
+def get_lemmatizer():
+    global _lemmatizer
+    if _lemmatizer is None:
+        from nltk.stem import WordNetLemmatizer
+        _lemmatizer = WordNetLemmatizer()
+    return _lemmatizer
+
+
+def preprocess(text_data):
+    if pd.isnull(text_data):
+        return ""
+    cleaned_text = CLEANING_REGEX.sub('', text_data)
+    return cleaned_text
+
+
+def clean_series(series):
+    """Column-level ``preprocess``: nulls become "" and the pattern runs once over the column."""
+    return series.fillna('').astype(str).str.replace(COLUMN_CLEANING_PATTERN, '', regex=True)
+
+
+def get_wordnet_pos(treebank_tag):
+    if treebank_tag.startswith('J'):
+        return WORDNET_ADJ
+    elif treebank_tag.startswith('V'):
+        return WORDNET_VERB
+    elif treebank_tag.startswith('N'):
+        return WORDNET_NOUN
+    elif treebank_tag.startswith('R'):
+        return WORDNET_ADV
+    else:
+        return WORDNET_NOUN
+
+
+def lemmatize_tagged(word_pos_tags):
+    lemmatizer = get_lemmatizer()
+    lemmatized_words = [lemma_cache.lemmatize(lemmatizer, word, get_wordnet_pos(tag)) for word, tag in word_pos_tags]
+    return ' '.join(lemmatized_words)
+
+
+def lemmatize_text(text):
+    ensure_nltk_data()
+    from nltk import pos_tag, word_tokenize
+    return lemmatize_tagged(pos_tag(word_tokenize(text)))
+
+
+def _lemmatize_chunk(texts, batch_size):
+    ensure_nltk_data()
+    from nltk import pos_tag_sents, word_tokenize
+    results = []
+    for start in range(0, len(texts), batch_size):
+        batch = texts[start:start + batch_size]
+        tagged = pos_tag_sents([word_tokenize(text) for text in batch])
+        results.extend(lemmatize_tagged(word_pos_tags) for word_pos_tags in tagged)
+    return results
+
+
+def normalize_texts(texts, batch_size=1000, workers=1):
+    """Preprocess and lemmatize a sequence of texts, preserving order.
+
+    Produces the same strings as ``lemmatize_text(preprocess(x))`` per row,
+    but tags whole batches at once and can spread chunks over ``workers``
+    processes (``workers=None`` uses every core).
+    """
+    texts = clean_series(pd.Series(texts, dtype=object)).tolist()
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(texts) <= batch_size:
+        return _lemmatize_chunk(texts, batch_size)
+    chunk_size = -(-len(texts) // workers)
+    chunks = [texts[start:start + chunk_size] for start in range(0, len(texts), chunk_size)]
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk_result in executor.map(_lemmatize_chunk, chunks, [batch_size] * len(chunks)):
+            results.extend(chunk_result)
+    return results
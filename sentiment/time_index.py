@@ -0,0 +1,66 @@
+import numpy as np
+
+
+class TimeIndex:
+    """Offset table over a dataset sorted by its ``period`` key (year * 12 + month - 1).
+
+    ``periods`` holds each distinct period once, in order, and rows
+    ``offsets[i]:offsets[i + 1]`` are the rows of ``periods[i]``. Rows without
+    a period sort last and are never selected. A year range is located by
+    binary search and a month range becomes one contiguous slice per year, so
+    the cost of a filter depends on the number of years selected, not on the
+    number of rows.
+    """
+
+    def __init__(self, periods, offsets):
+        self.periods = periods
+        self.offsets = offsets
+
+    @classmethod
+    def build(cls, df):
+        period = df['period']
+        missing = period.isna().to_numpy()
+        dated = len(period) - int(missing.sum())
+        values = period.iloc[:dated].to_numpy(dtype=np.int64, na_value=-1)
+        if missing[:dated].any() or (values[1:] < values[:-1]).any():
+            raise ValueError("dataset is not sorted by period; load it through sentiment.ingest.load_normalized")
+        periods, starts = np.unique(values, return_index=True)
+        return cls(periods, np.append(starts, dated))
+
+    def _rows(self, first_period, end_period):
+        """Row range covering ``first_period <= period < end_period``."""
+        lo, hi = np.searchsorted(self.periods, [first_period, end_period])
+        return int(self.offsets[lo]), int(self.offsets[hi])
+
+    def slices(self, start_year, end_year, start_month, end_month):
+        """Contiguous, ascending (start, stop) row ranges inside the years and months."""
+        if start_year > end_year or start_month > end_month:
+            return []
+        if (start_month, end_month) == (1, 12):
+            ranges = [self._rows(start_year * 12, end_year * 12 + 12)]
+        else:
+            ranges = [self._rows(year * 12 + start_month - 1, year * 12 + end_month) for year in range(start_year, end_year + 1)]
+        return [(start, stop) for start, stop in ranges if start < stop]
+
+    def positions(self, start_year, end_year, start_month, end_month):
+        """Row positions inside the period, in dataset order."""
+        ranges = self.slices(start_year, end_year, start_month, end_month)
+        if not ranges:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([np.arange(start, stop) for start, stop in ranges])
+
+    def view(self, df, start_year, end_year, start_month, end_month):
+        """The rows of ``df`` inside the period; a zero-copy slice when they are contiguous."""
+        ranges = self.slices(start_year, end_year, start_month, end_month)
+        if len(ranges) == 1:
+            start, stop = ranges[0]
+            return df.iloc[start:stop]
+        return df.take(self.positions(start_year, end_year, start_month, end_month))
+
+    def select(self, positions, start_year, end_year, start_month, end_month):
+        """The entries of a sorted position array (e.g. a posting list) that fall inside the period."""
+        ranges = self.slices(start_year, end_year, start_month, end_month)
+        if not ranges:
+            return positions[:0]
+        bounds = np.searchsorted(positions, np.array(ranges).ravel())
+        return np.concatenate([positions[lo:hi] for lo, hi in bounds.reshape(-1, 2)])
@@ -0,0 +1,65 @@
+import numpy as np
+
+from sentiment.ingest import load_normalized
+
+VECTORIZER_MODES = ('tfidf', 'hashing')
+DEFAULT_HASHING_FEATURES = 2 ** 18
+DEFAULT_HOLDOUT = 0.2
+
+
+def make_vectorizer(mode='tfidf', n_features=DEFAULT_HASHING_FEATURES):
+    """An unfitted vectorizer for ``mode``.
+
+    ``hashing`` maps tokens to one of ``n_features`` columns by hash, so the
+    fitted object is just its parameters: no vocabulary to pickle, load or
+    grow with each retrain. Features are unsigned and l2-normalised like the
+    TF-IDF rows, but without idf weighting.
+    """
+    # sklearn is imported on use so sentiment.online, which shares these
+    # helpers, can be imported by the dashboard without it.
+    from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+    if mode == 'tfidf':
+        return TfidfVectorizer(stop_words='english')
+    if mode == 'hashing':
+        return HashingVectorizer(n_features=n_features, alternate_sign=False, stop_words='english')
+    raise ValueError(f"unknown vectorizer mode {mode!r}; expected one of {', '.join(VECTORIZER_MODES)}")
+
+
+def training_data(csv_path, workers=1):
+    """Lemmatized reviews and their labels, the same normalization predict_data applies."""
+    df = load_normalized(csv_path, lemmatize=True, workers=workers)
+    df = df[df['Actual_sentiment'].notna()]
+    return df['review_lemmatized'].to_numpy(dtype=object), df['Actual_sentiment'].to_numpy(dtype=np.int64)
+
+
+def holdout_split(rows, holdout=DEFAULT_HOLDOUT, seed=0):
+    """Shuffled (train, test) row positions with ``holdout`` of the rows held out."""
+    order = np.random.default_rng(seed).permutation(rows)
+    test_rows = int(round(rows * holdout))
+    return order[test_rows:], order[:test_rows]
+
+
+def fit(texts, labels, mode='tfidf', n_features=DEFAULT_HASHING_FEATURES):
+    from sklearn.svm import LinearSVC
+    vectorizer = make_vectorizer(mode, n_features)
+    model = LinearSVC().fit(vectorizer.fit_transform(texts), labels)
+    return vectorizer, model
+
+
+def train(texts, labels, mode='tfidf', n_features=DEFAULT_HASHING_FEATURES, holdout=DEFAULT_HOLDOUT, seed=0, refit=False):
+    """Fit a vectorizer and LinearSVC; returns (vectorizer, model, holdout accuracy or None).
+
+    The accuracy is measured on ``holdout`` of the rows, which the returned
+    model never saw unless ``refit`` is set: then the vectorizer and model are
+    fitted again on every row once the accuracy is known, so the returned
+    model is the one to ship and the accuracy is an estimate for it.
+    """
+    train_rows, test_rows = holdout_split(len(texts), holdout, seed)
+    vectorizer, model = fit(texts[train_rows], labels[train_rows], mode, n_features)
+    accuracy = None
+    if len(test_rows):
+        predictions = model.predict(vectorizer.transform(texts[test_rows]))
+        accuracy = float((predictions == labels[test_rows]).mean())
+        if refit:
+            vectorizer, model = fit(texts, labels, mode, n_features)
+    return vectorizer, model, accuracy
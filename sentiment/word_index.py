@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+from sentiment.cube import filter_cube
+
+# WordCloud's default tokenizer.
+TOKEN_PATTERN = r"\w[\w']*"
+MAX_WORDS = 200
+
+
+class WordIndex:
+    """Inverted index over the titles of negative reviews.
+
+    ``counts`` holds token occurrences per (token, store_location, year,
+    month) cell, so word-cloud frequencies for any dashboard filter are a
+    cube-style sum. The posting lists map each token to the positions of the
+    reviews whose title contains it, in dataset order.
+    """
+
+    def __init__(self, vocabulary, counts, offsets, review_ids):
+        self.vocabulary = vocabulary
+        self.counts = counts
+        self.offsets = offsets
+        self.review_ids = review_ids
+        self._codes = {token: code for code, token in enumerate(vocabulary)}
+
+    @classmethod
+    def build(cls, df, text_column='title'):
+        """Index the negative reviews of ``df``; review ids are positions in ``df``."""
+        from wordcloud import STOPWORDS
+        reviews = df.reset_index(drop=True)
+        negative = reviews[reviews['Actual_sentiment'] == 0]
+        tokens = negative[text_column].str.lower().str.findall(TOKEN_PATTERN).explode().dropna().astype(object)
+        # WordCloud drops a trailing possessive, numbers and stopwords the same way.
+        tokens = tokens.str.replace(r"'s$", '', regex=True)
+        tokens = tokens[~tokens.str.isdigit() & ~tokens.isin(STOPWORDS) & (tokens != '')]
+
+        codes, vocabulary = pd.factorize(tokens.to_numpy())
+        review_ids = tokens.index.to_numpy()
+        cells = reviews.loc[review_ids, ['store_location', 'date', 'month']].reset_index(drop=True)
+        cells['token'] = codes
+        cells = cells[cells['date'].notna() & cells['month'].notna()]
+        counts = cells.groupby(['token', 'store_location', 'date', 'month'], dropna=False, observed=True).size().rename('count').reset_index()
+
+        # One posting per (token, review), grouped by token and in review order.
+        postings = pd.DataFrame({'token': codes, 'review': review_ids}).drop_duplicates().sort_values(['token', 'review'], kind='stable')
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(postings['token'], minlength=len(vocabulary)))])
+        return cls(np.asarray(vocabulary, dtype=object), counts, offsets, postings['review'].to_numpy())
+
+    def frequencies(self, start_year, end_year, start_month, end_month, store_location=None, max_words=MAX_WORDS):
+        """Most frequent tokens in the filtered negative titles, as {token: count}, largest first."""
+        cells = filter_cube(self.counts, start_year, end_year, start_month, end_month)
+        if store_location is not None:
+            cells = cells[cells['store_location'] == store_location]
+        totals = cells.groupby('token')['count'].sum().nlargest(max_words)
+        return {self.vocabulary[code]: int(count) for code, count in totals.items()}
+
+    def reviews_with(self, token):
+        """Positions of the reviews whose title contains ``token``."""
+        code = self._codes.get(token)
+        if code is None:
+            return self.review_ids[:0]
+        return self.review_ids[self.offsets[code]:self.offsets[code + 1]]
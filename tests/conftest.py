@@ -0,0 +1,17 @@
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.svm import LinearSVC
+
+POSITIVE = ["great shirt love it", "fast shipping great quality", "love the print", "perfect fit soft fabric"]
+NEGATIVE = ["awful faded print", "wrong size never arrived", "cheap fabric cracked print", "late and wrong colour"]
+
+
+@pytest.fixture(scope='session')
+def fitted_model():
+    """A TF-IDF LinearSVC fitted in memory on a handful of reviews."""
+    texts = np.array(POSITIVE + NEGATIVE, dtype=object)
+    labels = np.array([1] * len(POSITIVE) + [0] * len(NEGATIVE))
+    vectorizer = TfidfVectorizer()
+    model = LinearSVC().fit(vectorizer.fit_transform(texts), labels)
+    return vectorizer, model
@@ -0,0 +1,44 @@
+import json
+import threading
+
+import pytest
+
+from sentiment import artifacts
+from sentiment.artifacts import ARTIFACTS, Artifact, ArtifactUnavailable, fetch_artifact, sha256sum
+
+
+def fetch_concurrently(name, artifact_dir, count=4, **kwargs):
+    paths = []
+    threads = [threading.Thread(target=lambda: paths.append(fetch_artifact(name, offline=True, artifact_dir=str(artifact_dir), **kwargs)))
+               for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return paths
+
+
+def test_concurrent_fetches_install_one_verified_copy(tmp_path):
+    paths = fetch_concurrently('logo', tmp_path)
+    assert paths == [str(tmp_path / 'logo.png')] * 4
+    assert sha256sum(paths[0]) == ARTIFACTS['logo'].sha256
+    assert [p.name for p in tmp_path.iterdir()] == ['logo.png']
+
+
+def test_mismatched_bundled_copy_is_not_installed(tmp_path, monkeypatch):
+    monkeypatch.setitem(ARTIFACTS, 'logo', ARTIFACTS['logo']._replace(sha256='0' * 64))
+    with pytest.raises(ArtifactUnavailable):
+        fetch_artifact('logo', offline=True, artifact_dir=str(tmp_path))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_trust_on_first_use_records_the_checksum(tmp_path, monkeypatch):
+    monkeypatch.setitem(ARTIFACTS, 'unpinned', Artifact('unpinned.png', None, ARTIFACTS['logo'].bundled, None))
+    with pytest.raises(ArtifactUnavailable, match="--trust-on-first-use"):
+        fetch_artifact('unpinned', offline=True, artifact_dir=str(tmp_path), trust_first=False)
+    fetch_concurrently('unpinned', tmp_path, trust_first=True)
+    assert sorted(p.name for p in tmp_path.iterdir()) == [artifacts.MANIFEST_NAME, 'unpinned.png']
+    with open(tmp_path / artifacts.MANIFEST_NAME, encoding='utf-8') as f:
+        assert json.load(f) == {'unpinned.png': ARTIFACTS['logo'].sha256}
+    # Recorded, so later fetches no longer need trust on first use.
+    assert fetch_artifact('unpinned', offline=True, artifact_dir=str(tmp_path), trust_first=False) == str(tmp_path / 'unpinned.png')
@@ -0,0 +1,93 @@
+import threading
+
+import pandas as pd
+import pytest
+
+from sentiment.ingest import ReadOnlyFrame, build_normalized_cache, cache_path, load_normalized, read_only
+
+
+@pytest.fixture
+def frames():
+    source = pd.DataFrame({
+        'title': pd.array(["great", "awful", "fine"], dtype='str'),
+        'store_location': pd.Categorical(["US", "GB", "US"]),
+        'date': pd.array([2019, 2020, 2021], dtype='int16'),
+    })
+    return read_only(source), source.copy(deep=True)
+
+
+WRITES = {
+    'loc': lambda df: df.loc.__setitem__((0, 'title'), "changed"),
+    'iloc': lambda df: df.iloc.__setitem__((0, 1), "GB"),
+    'at': lambda df: df.at.__setitem__((0, 'date'), 1999),
+    'iat': lambda df: df.iat.__setitem__((0, 0), "changed"),
+    'new column': lambda df: df.__setitem__('new', 1),
+    'replace column': lambda df: df.__setitem__('title', "changed"),
+    'delete column': lambda df: df.__delitem__('title'),
+    'pop': lambda df: df.pop('title'),
+    'insert': lambda df: df.insert(0, 'new', 1),
+    'replace inplace': lambda df: df.replace("great", "changed", inplace=True),
+    'fillna inplace': lambda df: df.fillna(0, inplace=True),
+    'rename inplace': lambda df: df.rename(columns={'title': 'name'}, inplace=True),
+    'sort inplace': lambda df: df.sort_values('date', ascending=False, inplace=True),
+    'dropna inplace': lambda df: df.dropna(inplace=True),
+    'columns': lambda df: setattr(df, 'columns', ['a', 'b', 'c']),
+    'index': lambda df: setattr(df, 'index', [5, 6, 7]),
+    'update': lambda df: df.update(pd.DataFrame({'date': [1999]})),
+    'to_numpy': lambda df: df['date'].to_numpy().__setitem__(0, 1999),
+}
+
+
+@pytest.mark.parametrize('write', WRITES.values(), ids=WRITES.keys())
+def test_writes_to_the_shared_frame_raise(frames, write):
+    df, expected = frames
+    with pytest.raises(ValueError):
+        write(df)
+    pd.testing.assert_frame_equal(pd.DataFrame(df), expected)
+
+
+def test_derived_frames_are_writable_and_leave_it_unchanged(frames):
+    df, expected = frames
+    view = df[df['date'] > 2019]
+    view.loc[view.index[0], 'title'] = "changed"
+    view['new'] = 1
+    copied = df.copy()
+    copied['store_location'] = "DE"
+    head = df.iloc[:2]
+    head.iloc[0, 0] = "changed"
+    for derived in (view, copied, head, df.sort_values('date'), df.replace("great", "changed")):
+        assert type(derived) is pd.DataFrame
+    assert isinstance(df, ReadOnlyFrame)
+    pd.testing.assert_frame_equal(pd.DataFrame(df), expected)
+
+
+def test_reads_work(frames):
+    df, _ = frames
+    assert df.loc[1, 'title'] == "awful"
+    assert df.iloc[2]['date'] == 2021
+    assert df.at[0, 'store_location'] == "US"
+    assert df.loc(axis=0)[[0, 2]]['title'].tolist() == ["great", "fine"]
+    assert df.groupby('store_location', observed=True)['date'].max().to_dict() == {'GB': 2020, 'US': 2021}
+
+
+def test_concurrent_cache_builds_leave_one_file(tmp_path):
+    csv_path = tmp_path / 'reviews.csv'
+    pd.DataFrame({
+        'title': ["Great!", "Awful 2/10"],
+        'review': ["Love it", "Faded_after one wash"],
+        'store_location': ["US", "GB"],
+        'date': [2021, 2020],
+        'month': [3, 7],
+        'Actual_sentiment': [1, 0],
+    }).to_csv(csv_path, index=False)
+    cache_dir = tmp_path / 'cache'
+    threads = [threading.Thread(target=build_normalized_cache, args=(str(csv_path),), kwargs={'cache_dir': str(cache_dir)}) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    path = cache_path(str(csv_path), cache_dir=str(cache_dir))
+    assert [p.name for p in cache_dir.iterdir()] == [path.rsplit('/', 1)[-1]]
+    df = load_normalized(str(csv_path), cache_dir=str(cache_dir))
+    assert df['review'].tolist() == ["Fadedafter one wash", "Love it"]
+    assert df['date'].tolist() == [2020, 2021]
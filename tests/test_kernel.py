@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from sentiment.kernel import LinearKernel
+from sentiment.packed import SortedVocabulary, pack_vectorizer
+
+KNOWN = ["great shirt love it", "awful faded print", "wrong size never arrived", "perfect fit soft fabric"]
+UNSEEN = ["zebra xylophone", "great zebra", "never heard of this brand"]
+EMPTY = ["", "   ", "!!!"]
+BATCH = KNOWN + UNSEEN + EMPTY + ["love love love it", "Great PRINT, awful fabric"]
+
+
+@pytest.fixture(params=['dict', 'sorted'])
+def models(request, fitted_model):
+    vectorizer, model = fitted_model
+    if request.param == 'sorted':
+        vectorizer = pack_vectorizer(vectorizer)
+        assert isinstance(vectorizer.vocabulary_, SortedVocabulary)
+    return vectorizer, model, LinearKernel(vectorizer, model)
+
+
+@pytest.mark.parametrize('text', BATCH)
+def test_single_text_matches_model(models, text):
+    vectorizer, model, kernel = models
+    X = vectorizer.transform([text])
+    assert kernel.predict_one(text) == model.predict(X)[0]
+    np.testing.assert_allclose(kernel.decision_function([text]), model.decision_function(X))
+
+
+def test_batch_matches_model(models):
+    vectorizer, model, kernel = models
+    X = vectorizer.transform(BATCH)
+    np.testing.assert_array_equal(kernel.predict(BATCH), model.predict(X))
+    np.testing.assert_allclose(kernel.decision_function(BATCH), model.decision_function(X))
+
+
+def test_empty_batch(models):
+    kernel = models[2]
+    assert kernel.predict([]).shape == (0,)
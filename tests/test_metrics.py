@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from sklearn.metrics import accuracy_score, classification_report, f1_score, precision_score, recall_score
+
+from sentiment.metrics import SentimentMetrics
+
+rng = np.random.default_rng(0)
+CASES = {
+    'random': (rng.integers(0, 2, 500), rng.integers(0, 2, 500)),
+    'skewed': (rng.random(500) < 0.9, rng.random(500) < 0.2),
+    'only positive': (np.ones(50, dtype=int), np.ones(50, dtype=int)),
+    'only negative': (np.zeros(50, dtype=int), np.zeros(50, dtype=int)),
+    'negative actual, positive predicted': (np.zeros(50, dtype=int), np.ones(50, dtype=int)),
+    'positive actual, mixed predicted': (np.ones(50, dtype=int), rng.integers(0, 2, 50)),
+}
+
+
+def assert_same_report(report, expected):
+    assert report.keys() == expected.keys()
+    for key, value in expected.items():
+        assert report[key] == pytest.approx(value), key
+
+
+@pytest.mark.parametrize('actual, predicted', CASES.values(), ids=CASES.keys())
+def test_matches_sklearn(actual, predicted):
+    actual, predicted = actual.astype(int), predicted.astype(int)
+    metrics = SentimentMetrics().update(actual, predicted)
+    assert metrics.total == len(actual)
+    assert metrics.accuracy == pytest.approx(accuracy_score(actual, predicted))
+    for label in (0, 1):
+        assert metrics.precision(label) == pytest.approx(precision_score(actual, predicted, pos_label=label, zero_division=0))
+        assert metrics.recall(label) == pytest.approx(recall_score(actual, predicted, pos_label=label, zero_division=0))
+        assert metrics.f1(label) == pytest.approx(f1_score(actual, predicted, pos_label=label, zero_division=0))
+    assert_same_report(metrics.classification_report(), classification_report(actual, predicted, output_dict=True, zero_division=0))
+
+
+def test_rows_without_a_label_are_skipped():
+    actual = np.array([1, np.nan, 0, 2, 1, 0], dtype=object)
+    predicted = np.array([1, 0, 1, 1, 0, 0])
+    metrics = SentimentMetrics().update(actual, predicted)
+    kept = [0, 2, 4, 5]
+    assert metrics.total == len(kept)
+    assert_same_report(metrics.classification_report(),
+                       classification_report(actual[kept].astype(int), predicted[kept], output_dict=True, zero_division=0))
+
+
+@pytest.mark.parametrize('chunks', [1, 3, 7, 500])
+def test_chunks_combine_into_one_pass(chunks):
+    actual, predicted = CASES['random']
+    whole = SentimentMetrics().update(actual, predicted)
+    parts = [SentimentMetrics().update(a, p) for a, p in zip(np.array_split(actual, chunks), np.array_split(predicted, chunks))]
+    summed = sum(parts[1:], parts[0])
+    merged = SentimentMetrics()
+    for part in parts:
+        merged.merge(part)
+    for combined in (summed, merged):
+        np.testing.assert_array_equal(combined.counts, whole.counts)
+        assert combined.classification_report() == whole.classification_report()
+    # + leaves its operands alone.
+    assert parts[0].total == len(np.array_split(actual, chunks)[0])
+
+
+def test_merge_rejects_other_labels():
+    with pytest.raises(ValueError):
+        SentimentMetrics().merge(SentimentMetrics(labels=(0, 1, 2)))
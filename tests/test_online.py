@@ -0,0 +1,65 @@
+import subprocess
+import sys
+import threading
+
+import numpy as np
+
+from sentiment.online import ModelStore
+
+
+def run_concurrently(target, count):
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_concurrent_saves_get_distinct_versions(tmp_path):
+    versions = []
+    run_concurrently(lambda i: versions.append(ModelStore(str(tmp_path)).save({'i': i}, {'i': i}, parent=None)), 8)
+    assert sorted(versions) == list(range(1, 9))
+    store = ModelStore(str(tmp_path))
+    assert store.versions() == list(range(1, 9))
+    assert sorted(store.load(version)[0]['i'] for version in store.versions()) == list(range(8))
+
+
+def test_concurrent_holdout_writes_keep_every_row(tmp_path):
+    def add(i):
+        ModelStore(str(tmp_path)).add_holdout(np.array([f"review {i} {j}" for j in range(5)], dtype=object), np.ones(5, dtype=np.int64))
+    run_concurrently(add, 8)
+    assert len(ModelStore(str(tmp_path)).holdout()) == 40
+    assert [path.name for path in tmp_path.iterdir() if path.name.endswith('.tmp')] == []
+
+
+def test_holdout_is_deduplicated_by_text(tmp_path):
+    store = ModelStore(str(tmp_path))
+    texts = np.array(["love it", "hate it", "love it"], dtype=object)
+    store.add_holdout(texts, np.array([1, 0, 0]))
+    frame = store.add_holdout(texts, np.array([1, 0, 1]))
+    assert frame['text'].tolist() == ["love it", "hate it"]
+    assert frame['label'].tolist() == [1, 0]
+    assert store.holdout()['text'].tolist() == ["love it", "hate it"]
+
+
+def test_import_does_not_load_sklearn():
+    code = "import sys, sentiment.online; print('sklearn' in sys.modules)"
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == 'False'
+
+
+def test_concurrent_updates_build_on_each_other(tmp_path):
+    texts = np.array([f"great review {i}" for i in range(20)] + [f"awful review {i}" for i in range(20)], dtype=object)
+    labels = np.array([1] * 20 + [0] * 20)
+    store = ModelStore(str(tmp_path))
+    store.initialize(texts, labels, n_features=2 ** 10)
+
+    def update(i):
+        batch = np.array([f"batch {i} love {j}" for j in range(10)], dtype=object)
+        ModelStore(str(tmp_path)).update(batch, np.ones(10, dtype=np.int64), tolerance=1.0, seed=i)
+    run_concurrently(update, 4)
+
+    # Every update was promoted and started from the one promoted before it.
+    assert store.versions() == [1, 2, 3, 4, 5]
+    assert sorted(store.metadata(version)['parent'] for version in (2, 3, 4, 5)) == [1, 2, 3, 4]
+    assert store.current() == 5
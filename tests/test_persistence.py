@@ -0,0 +1,60 @@
+import json
+import threading
+import time
+
+from sentiment.lemma_cache import LemmaCache
+from sentiment.persistence import DebouncedSave
+from sentiment.prediction_cache import PredictionCache
+
+
+def test_debounced_save_coalesces_requests():
+    saved = threading.Event()
+    calls = []
+    saver = DebouncedSave(lambda: (calls.append(time.monotonic()), saved.set()), delay=0.05)
+    requested = time.monotonic()
+    for _ in range(10):
+        saver.request()
+    assert saved.wait(5)
+    time.sleep(0.1)
+    assert len(calls) == 1
+    assert calls[0] - requested >= 0.05
+
+
+def test_flush_runs_a_pending_save_now():
+    calls = []
+    saver = DebouncedSave(lambda: calls.append(1), delay=60)
+    saver.flush()
+    assert calls == []
+    saver.request()
+    saver.flush()
+    assert calls == [1]
+
+
+def test_save_later_writes_the_cache(tmp_path):
+    path = str(tmp_path / 'predictions.json')
+    cache = PredictionCache()
+    cache.put_many(['a', 'b'], [1, 0])
+    cache.save_later(path, delay=0.01)
+    cache.put_many(['c'], [1])
+    cache.save_later(path, delay=0.01)
+    deadline = time.monotonic() + 5
+    while not (tmp_path / 'predictions.json').exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.05)
+    reloaded = PredictionCache()
+    assert reloaded.load(path)
+    assert reloaded.get_many(['a', 'b', 'c']) == [1, 0, 1]
+
+
+def test_concurrent_saves_leave_one_complete_file(tmp_path):
+    path = str(tmp_path / 'lemmas.json')
+    cache = LemmaCache()
+    cache._entries.update({(f"word{i}", 'n'): f"lemma{i}" for i in range(1000)})
+    threads = [threading.Thread(target=cache.save, args=(path,)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert [p.name for p in tmp_path.iterdir()] == ['lemmas.json']
+    with open(path, encoding='utf-8') as f:
+        assert len(json.load(f)['entries']) == 1000
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import sentiment.predict
+from sentiment.prediction_cache import PredictionCache
+from sentiment.predict import predict_data
+from sentiment.text import preprocess
+
+REVIEWS = ["Great shirt, LOVE it!", "awful faded print", None, "Great shirt, LOVE it!", np.nan,
+           "wrong size never arrived", "awful faded print", "", "perfect fit soft fabric"]
+
+
+@pytest.fixture
+def normalized(monkeypatch):
+    """Stands in for lemmatization and records the texts each call normalizes."""
+    calls = []
+
+    def lowercase(texts, batch_size=1000, workers=1):
+        calls.append(list(texts))
+        return [text.lower() for text in texts]
+    monkeypatch.setattr(sentiment.predict, 'normalize_texts', lowercase)
+    return calls
+
+
+def expected_labels(fitted_model, reviews):
+    vectorizer, model = fitted_model
+    return model.predict(vectorizer.transform([preprocess(review).lower() for review in reviews]))
+
+
+def test_duplicates_and_missing_rows_keep_their_order(fitted_model, normalized):
+    labels = predict_data(pd.DataFrame({'review': REVIEWS}), *fitted_model)
+    np.testing.assert_array_equal(labels, expected_labels(fitted_model, REVIEWS))
+    # None, NaN and "" all clean to "", so each distinct text is normalized once.
+    assert sorted(normalized[0]) == sorted({preprocess(review) for review in REVIEWS})
+
+
+def test_cached_texts_are_not_scored_again(fitted_model, normalized):
+    cache = PredictionCache()
+    data = pd.DataFrame({'review': REVIEWS})
+    first = predict_data(data, *fitted_model, cache=cache, model_key='model-a')
+    assert (cache.hits, cache.misses) == (0, 5)
+
+    second = predict_data(data.iloc[::-1], *fitted_model, cache=cache, model_key='model-a')
+    np.testing.assert_array_equal(second, first[::-1])
+    assert (cache.hits, cache.misses) == (5, 5)
+    assert len(normalized) == 1
+
+    other = predict_data(data, *fitted_model, cache=cache, model_key='model-b')
+    np.testing.assert_array_equal(other, first)
+    assert (cache.hits, cache.misses) == (5, 10)
+    assert len(normalized) == 2
+
+
+def test_single_text(fitted_model, normalized):
+    assert predict_data("Great shirt, LOVE it!", *fitted_model) == expected_labels(fitted_model, ["Great shirt, LOVE it!"])
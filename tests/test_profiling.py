@@ -0,0 +1,41 @@
+import pytest
+
+from sentiment import profiling
+
+
+@pytest.fixture
+def timings():
+    profiling.enable()
+    profiling.timings.reset()
+    yield profiling.timings
+    profiling.enable(False)
+    profiling.timings.reset()
+
+
+def test_timed_records_rows_from_the_arguments(timings):
+    @profiling.timed(rows=lambda items, factor: len(items))
+    def scale(items, factor):
+        return [item * factor for item in items]
+
+    assert scale([1, 2, 3], 2) == [2, 4, 6]
+    scale([4], factor=3)
+    stage = timings.snapshot()['scale']
+    assert stage['calls'] == 2
+    assert stage['rows'] == 4
+
+
+def test_timed_without_rows_records_none(timings):
+    @profiling.timed('named')
+    def noop():
+        return None
+
+    noop()
+    assert timings.snapshot()['named']['rows'] == 0
+
+
+def test_disabled_timed_skips_the_row_count():
+    @profiling.timed(rows=lambda: pytest.fail("row count evaluated while profiling is off"))
+    def noop():
+        return 1
+
+    assert noop() == 1
@@ -0,0 +1,76 @@
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+import sentiment.predict
+from sentiment.server import MicroBatcher, ScoringServer
+
+
+def lowercase(texts, batch_size=1000, workers=1):
+    # Stands in for lemmatization so the tests need no NLTK data.
+    if any('boom' in text for text in texts):
+        raise LookupError("Resource punkt_tab not found.")
+    return [text.lower() for text in texts]
+
+
+@pytest.fixture
+def server(fitted_model, monkeypatch):
+    monkeypatch.setattr(sentiment.predict, 'normalize_texts', lowercase)
+    server = ScoringServer(*fitted_model, port=0, max_wait_ms=20)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://{server.server_address[0]}:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def post(url, payload):
+    request = urllib.request.Request(url + '/predict', data=json.dumps(payload).encode(), headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as error:
+        return error.code, json.load(error)
+
+
+def test_predict(server):
+    status, body = post(server, {'texts': ["great shirt, love it", "awful faded print"]})
+    assert status == 200
+    assert body['predictions'] == [1, 0]
+    assert body['labels'] == ['Positive Sentiment', 'Negative Sentiment']
+    assert post(server, {'text': "love the print"})[1]['predictions'] == [1]
+
+
+def test_bad_payload(server):
+    assert post(server, {'texts': "not a list"})[0] == 400
+
+
+def test_scoring_error_returns_500(server):
+    status, body = post(server, {'text': "boom"})
+    assert status == 500
+    assert 'LookupError' in body['error']
+    # The server keeps answering after a failed request.
+    assert post(server, {'text': "great shirt"})[0] == 200
+
+
+def test_failed_batch_only_fails_the_bad_request():
+    def predict_batch(texts):
+        if 'bad' in texts:
+            raise ValueError('bad text')
+        return [len(text) for text in texts]
+
+    batcher = MicroBatcher(predict_batch, max_batch_size=10, max_wait=0.2)
+    try:
+        good = batcher.submit(['ok', 'fine'])
+        time.sleep(0.01)
+        bad = batcher.submit(['bad'])
+        assert good.result(timeout=5) == [2, 4]
+        with pytest.raises(ValueError):
+            bad.result(timeout=5)
+    finally:
+        batcher.close()
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from sentiment.artifacts import ensure_nltk_data
+from sentiment.text import clean_series, lemmatize_text, normalize_texts, preprocess
+
+TEXTS = [
+    "Great shirts, loved the printed colours!!",
+    "The sizes were running small and it faded after 2 washes",
+    None,
+    np.nan,
+    "",
+    "   ",
+    "Café-quality fabric; señor approved",
+    "wrong_size\tdelivered\nlate",
+    "Great shirts, loved the printed colours!!",
+    "It's the best one I've bought",
+]
+CLEANING_CASES = [
+    ''.join(map(chr, range(128))),
+    "field\x1cgroup\x1drecord\x1eunit\x1fseparators",
+    "nul\x00bell\x07escape\x1bdelete\x7f",
+    "no-break\u00a0em\u2003ideographic\u3000line\u2028spaces",
+    "digits 10/10 ٣ ３ ² ½ 2nd",
+    "Café naïve señor ÆØÅ straße Ωmega",
+    "emoji 😀👍🏽 and A+++ print_quality __init__",
+    "it's 'quoted' \"double\"",
+    None,
+    np.nan,
+    "",
+]
+
+
+@pytest.mark.parametrize('dtype', [object, 'str'])
+def test_clean_series_matches_preprocess(dtype):
+    series = pd.Series(CLEANING_CASES, dtype=dtype)
+    assert clean_series(series).tolist() == [preprocess(text) for text in CLEANING_CASES]
+
+
+@pytest.fixture(scope='module')
+def nltk_data():
+    try:
+        ensure_nltk_data(offline=True)
+    except LookupError as exc:
+        pytest.skip(f"NLTK data unavailable: {exc}")
+
+
+@pytest.mark.usefixtures('nltk_data')
+@pytest.mark.parametrize('workers', [1, 2])
+@pytest.mark.parametrize('batch_size', [1, 3, 1000])
+def test_normalize_texts_matches_lemmatize_text(workers, batch_size):
+    texts = TEXTS * 3
+    expected = [lemmatize_text(preprocess(text)) for text in texts]
+    assert normalize_texts(texts, batch_size=batch_size, workers=workers) == expected
+
+
+@pytest.mark.usefixtures('nltk_data')
+def test_empty_input():
+    assert normalize_texts([]) == []
+    assert normalize_texts([], workers=2) == []
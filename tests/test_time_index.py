@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from sentiment.cube import build_sentiment_cube, filter_cube, period_key, review_mask
+from sentiment.ingest import sort_by_period
+from sentiment.time_index import TimeIndex
+
+PERIODS = {
+    'all': (2018, 2024, 1, 12),
+    'one year': (2021, 2021, 1, 12),
+    'whole years': (2019, 2022, 1, 12),
+    'month subset': (2019, 2022, 3, 7),
+    'one month': (2020, 2020, 6, 6),
+    'first and last month': (2018, 2024, 1, 1),
+    'december': (2018, 2024, 12, 12),
+    'no rows': (2030, 2031, 1, 12),
+    'inverted years': (2022, 2019, 1, 12),
+    'inverted months': (2019, 2022, 8, 3),
+}
+
+
+@pytest.fixture(scope='module')
+def df():
+    rng = np.random.default_rng(0)
+    rows = 2000
+    frame = pd.DataFrame({
+        'store_location': rng.choice(['US', 'GB', 'DE'], rows),
+        # 2023 is left out so that ranges across it hit a gap in the offsets.
+        'date': rng.choice([2018, 2019, 2020, 2021, 2022, 2024], rows).astype(float),
+        'month': rng.integers(1, 13, rows).astype(float),
+        'Actual_sentiment': rng.integers(0, 2, rows),
+    })
+    frame.loc[rng.choice(rows, 50, replace=False), 'date'] = np.nan
+    frame.loc[rng.choice(rows, 50, replace=False), 'month'] = np.nan
+    frame = sort_by_period(frame)
+    frame['period'] = period_key(frame['date'], frame['month'])
+    return frame
+
+
+def test_missing_dates_sort_last(df):
+    missing = (df['date'].isna() | df['month'].isna()).to_numpy()
+    assert missing.any()
+    assert not missing[:-missing.sum()].any()
+    index = TimeIndex.build(df)
+    assert index.offsets[-1] == len(df) - missing.sum()
+
+
+@pytest.mark.parametrize('period', PERIODS.values(), ids=PERIODS.keys())
+def test_matches_the_boolean_mask(df, period):
+    index = TimeIndex.build(df)
+    expected = np.flatnonzero(review_mask(df, *period))
+    np.testing.assert_array_equal(index.positions(*period), expected)
+    pd.testing.assert_frame_equal(index.view(df, *period), df.iloc[expected])
+    ranges = index.slices(*period)
+    assert all(start < stop for start, stop in ranges)
+    assert all(stop <= start for (_, stop), (start, _) in zip(ranges, ranges[1:]))
+
+
+@pytest.mark.parametrize('period', PERIODS.values(), ids=PERIODS.keys())
+def test_select_narrows_posting_lists(df, period):
+    index = TimeIndex.build(df)
+    postings = np.sort(np.random.default_rng(1).choice(len(df), 300, replace=False))
+    mask = review_mask(df, *period)
+    np.testing.assert_array_equal(index.select(postings, *period), postings[mask[postings]])
+
+
+def test_whole_year_ranges_are_one_slice(df):
+    index = TimeIndex.build(df)
+    assert len(index.slices(*PERIODS['whole years'])) == 1
+    assert len(index.slices(*PERIODS['month subset'])) == 4
+    assert index.slices(*PERIODS['inverted years']) == []
+    assert index.slices(*PERIODS['inverted months']) == []
+    assert index.slices(*PERIODS['no rows']) == []
+
+
+@pytest.mark.parametrize('period', PERIODS.values(), ids=PERIODS.keys())
+def test_cube_matches_filter_cube(df, period):
+    cube = build_sentiment_cube(df)
+    pd.testing.assert_frame_equal(TimeIndex.build(cube).view(cube, *period), filter_cube(cube, *period))
+
+
+def test_unsorted_dataset_is_rejected(df):
+    with pytest.raises(ValueError, match="not sorted by period"):
+        TimeIndex.build(df.iloc[::-1].reset_index(drop=True))
+    with pytest.raises(ValueError, match="not sorted by period"):
+        # A dated row after an undated one.
+        TimeIndex.build(df.iloc[np.r_[len(df) - 1, 0:len(df) - 1]].reset_index(drop=True))